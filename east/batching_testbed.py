@@ -0,0 +1,71 @@
+import threading
+import time
+
+from east.common.batching import BatchingPredictor
+from east.emotion_analysis.data import TweetDataSet
+from east.emotion_analysis.sentence_level import UnigramEmotionMultinomialNB
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.sentiment_analysis.sentence_level import UnigramSentimentMaxEnt
+
+__author__ = 'bijoy'
+
+# Compares many threads calling get_prediction directly, with the same threads sharing a BatchingPredictor,
+# checks that the predictions are the same and prints the batch size and queue wait histograms
+
+THREADS = 32
+SETTINGS = [(64, 0.002), (256, 0.005), (1024, 0.02)]
+
+tweet_lines = [line for line, emotion in TweetDataSet(test_mode=False).get_training_set()]
+movie_lines = [line for line, sentiment in MovieReviewDataSet(test_mode=False).get_training_set()]
+
+
+def run_threads(predict, sentences):
+    """
+    Predicts the sentences from THREADS threads
+    :param predict: the function predicting a sentence
+    :param sentences: the list of sentences
+    :return: the predictions in the order of the sentences, and the elapsed time
+    """
+    predictions = [None] * len(sentences)
+
+    def work(offset):
+        for i in range(offset, len(sentences), THREADS):
+            predictions[i] = predict(sentences[i])
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(THREADS)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return predictions, time.time() - start
+
+
+def measure(name, algorithm, sentences):
+    """
+    Prints the sentences per second without and with batching
+    :param name: the name of the benchmark
+    :param algorithm: the sentence level algorithm
+    :param sentences: the list of sentences
+    :return: None
+    """
+    print(name + " : " + str(len(sentences)) + " sentences, " + str(THREADS) + " threads")
+    expected, elapsed = run_threads(algorithm.get_prediction, sentences)
+    print("    get_prediction : " + str(int(len(sentences) / elapsed)) + " sentences per second")
+
+    for max_batch_size, max_wait in SETTINGS:
+        predictor = BatchingPredictor(algorithm, max_batch_size, max_wait)
+        predictions, elapsed = run_threads(predictor.get_prediction, sentences)
+        stats = predictor.get_stats()
+        predictor.close()
+
+        print("    BatchingPredictor(" + str(max_batch_size) + ", " + str(max_wait) + ") : " +
+              str(int(len(sentences) / elapsed)) + " sentences per second, " +
+              "batch size mean " + str(round(stats["batch_size"]["mean"], 1)) +
+              ", queue wait p50 / p99 " + str(stats["queue_wait_ms"]["p50"]) +
+              " / " + str(stats["queue_wait_ms"]["p99"]) + " ms" +
+              ("" if predictions == expected else " (DIFFERENT PREDICTIONS)"))
+
+
+measure("UnigramEmotionMultinomialNB on tweets", UnigramEmotionMultinomialNB(), tweet_lines)
+measure("UnigramSentimentMaxEnt on movie reviews", UnigramSentimentMaxEnt(), movie_lines[:5000])
@@ -0,0 +1,226 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import timeit
+
+from east.toolkit import Toolkit
+
+__author__ = 'bijoy'
+
+VERSION = '1.0.0'
+
+SENTENCE_LEVEL = 'sentence'
+DOCUMENT_LEVEL = 'document'
+
+# the sentences of a benchmark document
+DOCUMENT_SENTENCES = 5
+
+
+def get_algorithms(sentiment, level):
+    """
+    :param sentiment: the sentiment (True) or the emotion (False) algorithms
+    :param level: SENTENCE_LEVEL or DOCUMENT_LEVEL
+    :return: the list of algorithms of the toolkit
+    """
+    if level == SENTENCE_LEVEL:
+        return Toolkit.sl_sentiment if sentiment else Toolkit.sl_emotion
+    return Toolkit.dl_sentiment if sentiment else Toolkit.dl_emotion
+
+
+def get_sentences(sentiment, count):
+    """
+    Reads a sample of the sentences of the bundled corpus, the same sample on every run
+    :param sentiment: the movie reviews (True) or the tweets (False)
+    :param count: the number of sentences
+    :return: the list of sentences
+    """
+    if sentiment:
+        from east.sentiment_analysis.data import MovieReviewDataSet as DataSet
+    else:
+        from east.emotion_analysis.data import TweetDataSet as DataSet
+
+    lines = [line for line, tag in DataSet.stream()]
+    random.Random(0).shuffle(lines)
+    return [lines[i % len(lines)] for i in range(count)]
+
+
+def get_latency_stats(latencies, items):
+    """
+    :param latencies: the list of the latencies of the calls in seconds
+    :param items: the number of sentences or documents of all the calls
+    :return: a dict with the throughput and the latency percentiles in ms
+    """
+    latencies = sorted(latencies)
+    total = sum(latencies)
+
+    def percentile(value):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * value / 100.0))] * 1000, 4)
+
+    return {"calls": len(latencies),
+            "items": items,
+            "seconds": round(total, 4),
+            "items_per_second": round(items / total, 1) if total else None,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(latencies[-1] * 1000, 4)}
+
+
+def time_calls(function, arguments):
+    """
+    :param function: the function to call
+    :param arguments: the list of the arguments of the calls
+    :return: the list of the latencies in seconds
+    """
+    latencies = list()
+    timer = timeit.default_timer
+    for argument in arguments:
+        start = timer()
+        function(argument)
+        latencies.append(timer() - start)
+    return latencies
+
+
+def get_batches(items, batch_size):
+    """
+    :param items: the list of sentences or documents
+    :param batch_size: the number of items of a batch
+    :return: the list of batches
+    """
+    return [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+
+
+def get_peak_rss():
+    """
+    :return: the peak resident memory of the process in MB
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on mac os
+    return round(peak / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0), 1)
+
+
+def run(sentiment, level, algorithm_id, options):
+    """
+    Benchmarks an algorithm, in a new process so that the load time and the memory are the ones of the algorithm alone
+    :param sentiment: sentiment (True) or emotion (False) analysis
+    :param level: SENTENCE_LEVEL or DOCUMENT_LEVEL
+    :param algorithm_id: the position of the algorithm in the toolkit list
+    :param options: the dict of the benchmark options
+    :return: the dict of the results
+    """
+    sentences = get_sentences(sentiment, options["sentences"])
+
+    start = timeit.default_timer()
+    if level == SENTENCE_LEVEL:
+        algorithm = get_algorithms(sentiment, level)[algorithm_id]()
+        # the models, lexicons and nltk resources are loaded on the first prediction
+        algorithm.predict_many(sentences[:1])
+        single, batch = algorithm.get_prediction, algorithm.predict_many
+        items = sentences
+    else:
+        toolkit = Toolkit(sentiment, options["sentence_level"], algorithm_id)
+        toolkit.analyse(sentences[0])
+        single, batch = toolkit.analyse, toolkit.analyse_many
+        items = [" ".join(sentence.strip() for sentence in batch_sentences)
+                 for batch_sentences in get_batches(sentences, DOCUMENT_SENTENCES)]
+    load_seconds = timeit.default_timer() - start
+
+    batches = get_batches(items, options["batch_size"])
+    return {"load_seconds": round(load_seconds, 4),
+            "single": get_latency_stats(time_calls(single, items), len(items)),
+            "batch": dict(get_latency_stats(time_calls(batch, batches), len(items)),
+                          batch_size=options["batch_size"]),
+            "peak_rss_mb": get_peak_rss()}
+
+
+def run_in_process(sentiment, level, algorithm_id, options, verbose=False):
+    """
+    Runs the benchmark of an algorithm in a new python process
+    :param sentiment: sentiment (True) or emotion (False) analysis
+    :param level: SENTENCE_LEVEL or DOCUMENT_LEVEL
+    :param algorithm_id: the position of the algorithm in the toolkit list
+    :param options: the dict of the benchmark options
+    :param verbose: show the output of the process
+    :return: the dict of the results, with the error if the process failed
+    """
+    command = [sys.executable, '-m', 'east.bench', '--run', json.dumps([sentiment, level, algorithm_id, options])]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=None if verbose else subprocess.PIPE)
+    output, errors = process.communicate()
+    if process.returncode != 0:
+        lines = (errors or '').strip().splitlines()
+        return {"error": lines[-1] if lines else "exit code " + str(process.returncode)}
+    return json.loads(output)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='east bench',
+                                     description='Benchmarks the algorithms of the toolkit over the bundled corpora '
+                                                 '(the tweets for emotion, the movie reviews for sentiment), '
+                                                 'each one in a new process, and prints the results as JSON')
+    parser.add_argument('-a', '--algorithm', action='append', dest='algorithms', default=None,
+                        help='only the algorithms with this name (can be repeated)')
+    parser.add_argument('--sentences', default=1000, type=int, help='the sentences predicted per algorithm')
+    parser.add_argument('--batch-size', default=100, type=int, help='the sentences (documents) of a batch')
+    parser.add_argument('--sentence-level', default=0, type=int,
+                        help='the sentence level algorithm of the document level benchmarks')
+    parser.add_argument('-o', '--output', default=None, type=str, help='write the JSON to this file')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show the output of the benchmark processes')
+    parser.add_argument('--run', default=None, help=argparse.SUPPRESS)
+    arguments = parser.parse_args(args)
+
+    if arguments.run:
+        sentiment, level, algorithm_id, options = json.loads(arguments.run)
+        print(json.dumps(run(sentiment, level, algorithm_id, options)))
+        return
+
+    if not 0 <= arguments.sentence_level < min(len(Toolkit.sl_sentiment), len(Toolkit.sl_emotion)):
+        parser.error("--sentence-level must be the id of both a sentiment and an emotion algorithm")
+    if arguments.sentences < 1 or arguments.batch_size < 1:
+        parser.error("--sentences and --batch-size must be at least 1")
+
+    logging.basicConfig(level=logging.INFO)
+    options = {"sentences": arguments.sentences,
+               "batch_size": arguments.batch_size,
+               "sentence_level": arguments.sentence_level}
+
+    results = list()
+    for level in (SENTENCE_LEVEL, DOCUMENT_LEVEL):
+        for sentiment in (False, True):
+            for algorithm_id, algorithm in enumerate(get_algorithms(sentiment, level)):
+                if arguments.algorithms and algorithm.__name__ not in arguments.algorithms:
+                    continue
+                logging.info("benchmarking " + algorithm.__name__)
+                result = {"algorithm": algorithm.__name__,
+                          "level": level,
+                          "sentiment": sentiment,
+                          "corpus": "movie_reviews" if sentiment else "tweets"}
+                if level == DOCUMENT_LEVEL:
+                    result["sentence_level"] = get_algorithms(sentiment, SENTENCE_LEVEL)[arguments.sentence_level].__name__
+                result.update(run_in_process(sentiment, level, algorithm_id, options, arguments.verbose))
+                results.append(result)
+
+    report = {"east_version": VERSION,
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "cpu_count": multiprocessing.cpu_count(),
+              "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+              "options": options,
+              "results": results}
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import random
+import time
+
+from east.common.caching import PredictionCache
+from east.emotion_analysis.data import TweetDataSet
+from east.emotion_analysis.sentence_level import UnigramEmotionMultinomialNB, EmotionScoreMultinomialNB
+from east.sentiment_analysis.sentence_level import UnigramSentimentMultinomialNB
+
+__author__ = 'bijoy'
+
+# Predicts a stream of tweets with repeated tweets (like retweets) with and without the prediction cache,
+# compares the predictions and the times, then checks that an update of the model clears the cache
+
+SENTENCES = 20000
+DISTINCT = 5000
+BATCH_SIZE = 100
+
+# the sentences ending with a backslash can not be decoded by Text.unicode_to_ascii
+tagged_lines = [(line, emotion) for line, emotion in TweetDataSet.stream() if '\\' not in line]
+random.Random(0).shuffle(tagged_lines)
+distinct_lines = [line for line, emotion in tagged_lines[:DISTINCT]]
+sentences = [random.Random(i).choice(distinct_lines) for i in range(SENTENCES)]
+
+
+def predict(algorithm):
+    """
+    :param algorithm: the sentence level algorithm
+    :return: the list of predictions of the sentences, and the elapsed time
+    """
+    start = time.time()
+    predictions = list()
+    for batch_start in range(0, len(sentences), BATCH_SIZE):
+        predictions += algorithm.predict_many(sentences[batch_start:batch_start + BATCH_SIZE])
+    return predictions, time.time() - start
+
+
+for algorithm_class in [UnigramEmotionMultinomialNB, UnigramSentimentMultinomialNB, EmotionScoreMultinomialNB]:
+    algorithm = algorithm_class()
+    algorithm.predict_many(sentences[:1])
+    expected, plain_time = predict(algorithm)
+    cache = PredictionCache(algorithm)
+    predictions, cached_time = predict(cache)
+    print(algorithm_class.__name__ + " : " + str(round(plain_time, 2)) + " s -> " + str(round(cached_time, 2)) +
+          " s with the cache" + ("" if predictions == expected else " (DIFFERENT PREDICTIONS)") +
+          ", " + str(cache.get_stats()))
+
+# a model trained (and updated) in memory, so that the model file is not changed
+algorithm = UnigramEmotionMultinomialNB()
+algorithm.train(tagged_lines[DISTINCT:], False)
+cache = PredictionCache(algorithm)
+predict(cache)
+for i in range(5):
+    cache.update([(line, 'joy') for line in distinct_lines[:1000]])
+expected, plain_time = predict(algorithm)
+predictions, cached_time = predict(cache)
+print("after the updates : " + ("same" if predictions == expected else "DIFFERENT") +
+      " predictions as the updated model, " + str(cache.get_stats()))
@@ -1,12 +1,121 @@
 from east.toolkit import Toolkit
+from collections import deque
 import argparse
+import json
 import logging
+import sys
 
 __author__ = 'bijoy'
 
+FLUSH_LINE = 'line'
+FLUSH_BATCH = 'batch'
+FLUSH_END = 'end'
+
+
+def read_documents(input_file, jsonl=False, field='text'):
+    """
+    Reads the documents one line at a time, so that only the current line is in memory
+    :param input_file: the file object to read from
+    :param jsonl: each line is a JSON record (instead of a plain document)
+    :param field: the field of the JSON record holding the document
+    :return: a generator of tuples (document, record), the record is the JSON record without the document field
+     (None for plain documents) or a dict with the error if the line could not be read
+    """
+    # readline does not read ahead like iterating over the file does, so a pipe is processed as it is written
+    for line in iter(input_file.readline, ''):
+        line = line.rstrip('\r\n')
+        if not jsonl:
+            yield line, None
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield None, {"error": "invalid JSON: " + str(error)}
+            continue
+
+        if not isinstance(record, dict) or not isinstance(record.get(field), basestring):
+            yield None, {"error": "invalid record: no string field " + field}
+            continue
+
+        document = record.pop(field)
+        if isinstance(document, unicode):
+            # the same bytes as the plain documents, the non ascii characters are dropped by the analysis
+            document = document.encode('utf-8')
+        yield document, record
+
+
+def stream(api, input_file, output_file, batch_size=100, jsonl=False, field='text', flush=FLUSH_BATCH, workers=1):
+    """
+    Analyses a stream of documents, one per line, writing one JSON result per line in the same order.
+    Only the batches being analysed are kept in memory, so the memory use stays flat whatever the size of the input.
+    :param api: the toolkit
+    :param input_file: the file object to read the documents from
+    :param output_file: the file object to write the results to
+    :param batch_size: the number of documents predicted together
+    :param jsonl: each line is a JSON record (the results are the records with the tag and the tags added)
+    :param field: the field of the JSON record holding the document
+    :param flush: flush the output after every FLUSH_LINE, FLUSH_BATCH or only at the FLUSH_END
+    :param workers: the number of worker processes analysing the batches
+    :return: the number of documents analysed
+    """
+    # the lines read and not written yet, the invalid ones are written in their place between the results
+    pending = deque()
+
+    def read():
+        for document, record in read_documents(input_file, jsonl, field):
+            pending.append((document, record))
+            if document is not None:
+                yield document
+
+    def write(result):
+        output_file.write(json.dumps(result) + '\n')
+        if flush == FLUSH_LINE:
+            output_file.flush()
+
+    count = 0
+    for result in api.analyse_iterable(read(), workers, batch_size):
+        document, record = pending.popleft()
+        while document is None:
+            write(record)
+            document, record = pending.popleft()
+
+        if record is not None:
+            record.update(result)
+            result = record
+        write(result)
+
+        count += 1
+        if flush == FLUSH_BATCH and count % batch_size == 0:
+            output_file.flush()
+
+    while pending:
+        write(pending.popleft()[1])
+    output_file.flush()
+    return count
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        # imported here, so that the plain command line does not pay for the server imports
+        from east import server
+        server.main(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        from east import bench
+        bench.main(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'microbench':
+        from east import microbench
+        microbench.main(sys.argv[2:])
+        return
+
     # Parses the arguments
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(epilog="east serve --help : the HTTP inference server ; "
+                                            "east bench --help : the throughput and latency benchmarks ; "
+                                            "east microbench --help : the benchmarks of the hot inner functions")
     parser.add_argument('-i', '--input', default=None, type=str, help='input to be tagged')
     parser.add_argument('-s', '--sentence', default=0, type=int,
                         help=Toolkit.get_help(True, True) + " ; " + Toolkit.get_help(False, True))
@@ -15,11 +124,31 @@ def main():
     parser.add_argument('-m', '--sentiment', action='store_true', help='do sentiment analysis')
     parser.add_argument('-c', '--club', action='store_true', help='treat a document as a single sentence')
     parser.add_argument('-f', '--file', default=None, type=str, help='read input from file')
+    parser.add_argument('--stream', action='store_true',
+                        help='read one document per line from the file (-f) or stdin, '
+                             'and write one JSON result per line to stdout')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='with --stream, each line is a JSON record with the document in the --field')
+    parser.add_argument('--field', default='text', type=str, help='the field of the JSON records with the document')
+    parser.add_argument('--batch-size', default=100, type=int, help='with --stream, documents predicted together')
+    parser.add_argument('--flush', default=FLUSH_BATCH, choices=[FLUSH_LINE, FLUSH_BATCH, FLUSH_END],
+                        help='with --stream, flush the output after every line, every batch or only at the end')
+    parser.add_argument('--workers', default=1, type=int,
+                        help='with --stream, the number of worker processes analysing the batches (0 for all cpus)')
+    parser.add_argument('--cache-size', default=0, type=int,
+                        help='cache the predictions of this many distinct sentences, '
+                             'the repeated sentences (retweets, spam) are not predicted again')
+    parser.add_argument('--cache-file', default=None, type=str,
+                        help='keep the results in this SQLite file, the documents analysed by a previous run '
+                             'with the same algorithms are not analysed again')
     arguments = parser.parse_args()
 
     # Evaluates the input for the analysis
     cli_input = arguments.input
-    if arguments.file is None and arguments.input is None:
+    if arguments.stream:
+        if arguments.batch_size < 1:
+            parser.error("--batch-size must be at least 1")
+    elif arguments.file is None and arguments.input is None:
         logging.error("No input provided, use -i or --input tag, see --help for more command line options")
         exit()
     elif arguments.file is not None:
@@ -29,10 +158,22 @@ def main():
     api = Toolkit(sentiment=arguments.sentiment,
                sentence_level=arguments.sentence,
                document_level=arguments.document,
-               club=arguments.club)
+               club=arguments.club,
+               cache_size=arguments.cache_size,
+               cache_file=arguments.cache_file)
+
+    if arguments.stream:
+        input_file = open(arguments.file, 'r') if arguments.file is not None else sys.stdin
+        try:
+            stream(api, input_file, sys.stdout, arguments.batch_size, arguments.jsonl, arguments.field,
+                   arguments.flush, arguments.workers or None)
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+        return
 
     # Prints out the result of the analysis
     print(api.analyse(cli_input))
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,55 @@
+import importlib
+
+__author__ = 'bijoy'
+
+
+class LazyAlgorithm:
+    """
+    A reference to an algorithm class by its module and name.
+    The module is imported only when the algorithm is first created,
+    so listing the algorithms (e.g. for the command line help) does not import sklearn or nltk.
+    """
+
+    def __init__(self, module, name):
+        """
+        :param module: the full name of the module of the algorithm class
+        :param name: the name of the algorithm class
+        """
+        self.module = module
+        self.__name__ = name
+        self.algorithm_class = None
+
+    def resolve(self):
+        """
+        Imports the module and returns the algorithm class
+        :return: the algorithm class
+        """
+        if self.algorithm_class is None:
+            self.algorithm_class = getattr(importlib.import_module(self.module), self.__name__)
+        return self.algorithm_class
+
+    def __call__(self, *args, **kwargs):
+        """
+        Creates an instance of the algorithm, same as calling the class
+        :return: the instance of the algorithm
+        """
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return self.module + "." + self.__name__
+
+
+SENTIMENT_SENTENCE_LEVEL = 'east.sentiment_analysis.sentence_level'
+SENTIMENT_DOCUMENT_LEVEL = 'east.sentiment_analysis.document_level'
+EMOTION_SENTENCE_LEVEL = 'east.emotion_analysis.sentence_level'
+EMOTION_DOCUMENT_LEVEL = 'east.emotion_analysis.document_level'
+
+
+def lazy_algorithms(module, names):
+    """
+    Creates the lazy references for the algorithm classes of a module
+    :param module: the full name of the module
+    :param names: the list of the names of the algorithm classes
+    :return: the list of lazy algorithms
+    """
+    return [LazyAlgorithm(module, name) for name in names]
@@ -1,11 +1,38 @@
 __author__ = 'bijoy'
+import hashlib
+import multiprocessing
 import os
 from east import BASE_DIR
 from collections import defaultdict
+from copy import deepcopy
+from itertools import islice
 
 from east.utilities.text import Text
 from east.utilities.storage import Storage
+from east.utilities.cache import ResourceCache
+from east.utilities.features import Features
+from east.utilities.metrics import Metrics
+from east.utilities.compiled_model import CompiledModel
+from east.utilities.update_log import UpdateLog
 from progressbar import ProgressBar
+from sklearn.base import clone
+
+# the data set and the algorithm of the forked processes of DataSet.test_folds_parallel, they inherit them
+parallel_test = None
+
+
+def test_parallel_fold(k):
+    """
+    Tests the k-th fold of parallel_test
+    :param k: the id of the fold
+    :return: the result dict object of the fold
+    """
+    data_set, algorithm = parallel_test
+    # the progress bars of the folds tested at the same time would write over each other
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 2)
+    os.close(devnull)
+    return data_set.test_fold(algorithm, k)
 
 
 class DataSet:
@@ -16,6 +43,10 @@ class DataSet:
     FOLDER = 'pickled/data/'
     FILENAME = 'data_set.pickled'
 
+    # the normalized words of the sentences of the data sets, by data set file and normalization key
+    # (see SentenceLevel.get_normalization_key), shared by all the folds and the algorithms tested
+    normalized_corpora = dict()
+
     def __init__(self, k=5, test_mode=True, allow_negation=True, normalize_classes=True):
         """
         The data set default constructor
@@ -50,12 +81,18 @@ class DataSet:
     def load(self):
         """
         Loads the data set from the variable / data file / pickled file
+        (the loaded mapping is shared with all the data sets using the same file, and must not be modified)
         :return: the data set
         """
         if not self.mapping:
-            self.mapping = Storage.load(self.get_absolute_path(self.FILENAME))
-            if not self.mapping:
-                self.mapping = self.read()
+            self.mapping = ResourceCache.get(self.get_absolute_path(self.FILENAME), self.read_mapping)
+
+    def read_mapping(self):
+        """
+        Reads the mapping from the pickled file, or from the data file if it is not pickled yet
+        :return: the mapping
+        """
+        return Storage.load(self.get_absolute_path(self.FILENAME)) or self.read()
 
     def read(self):
         """
@@ -65,24 +102,127 @@ class DataSet:
         """
         pass
 
-    def test_algorithm(self, algorithm, print_result=True):
+    @classmethod
+    def stream(cls):
+        """
+        Reads the tagged lines from the data file one at a time, without loading the data set
+        (the classes are not normalized, for new classes this needs to be implemented to train over a stream)
+        :return: a generator of (line, class) tuples
+        """
+        return iter(())
+
+    def test_algorithm(self, algorithm, print_result=True, parallel=False, workers=None):
         """
         Tests an algorithm using k-fold cross validation
         :param algorithm: the algorithm object
         :param print_result: print the result?
-        :return:
+        :param parallel: test the folds at the same time, each on a forked process with its own copy of the algorithm
+         (the algorithm object is then left untrained, without fork the folds are tested one after the other)
+        :param workers: the number of processes testing the folds (by default, as many as the folds or the cpus)
+        :return: the result dict object, the averages of the results of the folds
+        """
+        print(algorithm.__class__.__name__)
+        normalized_corpus = algorithm.normalized_corpus
+        algorithm.normalized_corpus = self.get_normalized_corpus(algorithm)
+        try:
+            if parallel and hasattr(os, 'fork'):
+                # normalized here once, instead of on every process
+                self.normalize_corpus(algorithm)
+                fold_results = self.test_folds_parallel(algorithm, workers)
+            else:
+                fold_results = list()
+                for k in range(self.k):
+                    print("Step " + str(k + 1) + " of " + str(self.k))
+                    fold_results.append(self.test_fold(algorithm, k))
+        finally:
+            algorithm.normalized_corpus = normalized_corpus
+
+        result = self.get_average_result(fold_results)
+        if print_result:
+            SentenceLevel.print_result(result)
+
+        return result
+
+    def get_normalized_corpus(self, algorithm):
+        """
+        Gets the normalized corpus of the data set for the normalization of an algorithm
+        :param algorithm: the algorithm object
+        :return: the dict object of the normalized words by sentence, None if the algorithm does not normalize
+        """
+        key = algorithm.get_normalization_key()
+        if key is None:
+            return None
+        return DataSet.normalized_corpora.setdefault((self.get_absolute_path(self.FILENAME), key), dict())
+
+    def normalize_corpus(self, algorithm):
+        """
+        Normalizes all the sentences of the data set (as they are and in lower case) into the normalized corpus
+        :param algorithm: the algorithm object, with its normalized corpus set
+        :return: None
+        """
+        if algorithm.normalized_corpus is None:
+            return
+        for lines in self.mapping.values():
+            for line in lines:
+                algorithm.get_normalized_words(line)
+                algorithm.get_normalized_words(line.lower())
+
+    @staticmethod
+    def clear_normalized_corpora():
+        """
+        Frees the normalized corpora
+        :return: None
+        """
+        DataSet.normalized_corpora.clear()
+
+    def test_fold(self, algorithm, k):
+        """
+        Trains the algorithm on the k-th training set and tests it on the k-th testing set
+        :param algorithm: the algorithm object
+        :param k: the id of the fold
+        :return: the result dict object of the fold
+        """
+        algorithm.train(self.get_training_set(k), False)
+        return algorithm.test(self.get_testing_set(k), False)
+
+    def test_folds_parallel(self, algorithm, workers=None):
+        """
+        Tests the folds on forked processes, every fold on a new process forked from this one,
+        so that it starts from the untrained algorithm and the loaded data set
+        :param algorithm: the algorithm object
+        :param workers: the number of processes testing the folds at the same time
+        :return: the list of the result dict objects of the folds, in the order of the folds
+        """
+        global parallel_test
+        workers = workers or min(self.k, multiprocessing.cpu_count())
+        parallel_test = (self, algorithm)
+        pool = multiprocessing.Pool(workers, maxtasksperchild=1)
+        try:
+            fold_results = list()
+            for result in pool.imap(test_parallel_fold, range(self.k), 1):
+                fold_results.append(result)
+                print("Step " + str(len(fold_results)) + " of " + str(self.k) + " done")
+            pool.close()
+            return fold_results
+        finally:
+            pool.terminate()
+            pool.join()
+            parallel_test = None
+
+    @staticmethod
+    def get_average_result(fold_results):
+        """
+        Averages the results of the folds
+        :param fold_results: the list of the result dict objects of the folds
+        :return: the result dict object with the average accuracy, precision and recall
         """
         result = dict()
         result["count"] = 0
         result["accuracy"] = 0
-        result["precision"] = defaultdict(lambda: 0)
-        result["recall"] = defaultdict(lambda: 0)
+        result["precision"] = defaultdict(int)
+        result["recall"] = defaultdict(int)
 
-        print(algorithm.__class__.__name__)
-        for k in range(self.k):
-            print("Step " + str(result["count"] + 1) + " of " + str(self.k))
-            algorithm.train(self.get_training_set(k), False)
-            k_result = algorithm.test(self.get_testing_set(k), False)
+        for k_result in fold_results:
             result["count"] += 1
             result["accuracy"] += k_result["accuracy"]
             for key, item in k_result["precision"].items():
@@ -98,9 +238,6 @@ class DataSet:
         for key, item in result["recall"].items():
             result["recall"][key] = float(item) / count
 
-        if print_result:
-            SentenceLevel.print_result(result)
-
         return result
 
     def get_training_set(self, training_set_id=0):
@@ -178,6 +315,74 @@ class SentenceLevel:
         self.filename = os.path.join(BASE_DIR, self.FOLDER, filename + ".pickled")
         self.text_utility = Text()
 
+        # the normalized words of the sentences, set while a data set tests the algorithm (see DataSet.test_algorithm)
+        self.normalized_corpus = None
+
+        # incremented every time the model changes (trained, updated or loaded), the cached predictions
+        # of an older version are dropped (see PredictionCache)
+        self.model_version = 0
+
+        # the md5 of the model file the model was loaded from or saved to (see get_model_fingerprint)
+        self.model_file_fingerprint = None
+
+    def get_normalization_key(self):
+        """
+        The configuration of normalize_words, the algorithms with the same key normalize a sentence to the same words
+        (For new classes normalizing the sentences, this needs to be implemented)
+        :return: a hashable key, None if the algorithm does not normalize the sentences
+        """
+        return None
+
+    def normalize_words(self, sentence):
+        """
+        Normalizes a sentence into the words the algorithm uses as features
+        (For new classes normalizing the sentences, this needs to be implemented)
+        :param sentence: the sentence
+        :return: the list of normalized words
+        """
+        pass
+
+    def normalize_sentence(self, sentence):
+        """
+        The text of the sentence the prediction depends on, the sentences with the same normalized text
+        get the same prediction (see PredictionCache)
+        (For new classes ignoring the case of the sentences, this can be implemented)
+        :param sentence: the sentence
+        :return: the normalized text
+        """
+        return sentence
+
+    def get_model_fingerprint(self):
+        """
+        Identifies the predictions of the algorithm across processes and runs, for the persistent prediction cache
+        (For new classes, this needs to be implemented for their predictions to be cached persistently)
+        :return: a string, None if the predictions can not be cached (like a model trained and not saved)
+        """
+        return None
+
+    def create_fingerprint(self, *parts):
+        """
+        :param parts: the settings and the model file fingerprints the predictions depend on
+        :return: the md5 (hex) of the class, the tokenizer and the parts
+        """
+        key = (self.__class__.__name__, self.text_utility.get_tokenizer_type()) + parts
+        return hashlib.md5(repr(key).encode('utf-8')).hexdigest()
+
+    def get_normalized_words(self, sentence):
+        """
+        Normalizes a sentence, from the normalized corpus if it is set (the words returned must not be modified)
+        :param sentence: the sentence
+        :return: the list of normalized words
+        """
+        if self.normalized_corpus is None:
+            return self.normalize_words(sentence)
+
+        words = self.normalized_corpus.get(sentence)
+        if words is None:
+            words = self.normalize_words(sentence)
+            self.normalized_corpus[sentence] = words
+        return words
+
     def train(self, training_set, save_file=True):
         """
         Train the model (if the model needs training)
@@ -188,6 +393,15 @@ class SentenceLevel:
         """
         pass
 
+    def update(self, tagged_lines):
+        """
+        Updates the trained model with more tagged lines, without training it again
+        (For new classes, this needs to be implemented if the model can be updated)
+        :param tagged_lines: an iterable of (line, class) tuples
+        :return: None
+        """
+        raise ValueError(self.__class__.__name__ + " can not be updated")
+
     def get_prediction(self, sentence):
         """
         Get the prediction for the sentence
@@ -197,6 +411,15 @@ class SentenceLevel:
         """
         pass
 
+    def predict_many(self, sentences):
+        """
+        Get the predictions for a list of sentences
+        (Algorithms backed by a trained engine should override this to predict all the sentences in one call)
+        :param sentences: the list of sentences
+        :return: the list of predictions, in the same order as the sentences
+        """
+        return [self.get_prediction(sentence) for sentence in sentences]
+
     def test(self, testing_set, should_print=True):
         """
         Test the model over a testing set
@@ -205,8 +428,8 @@ class SentenceLevel:
         :return: the result dict object
         """
         results = list()
-        precision = defaultdict(lambda: defaultdict(lambda: 0))
-        recall = defaultdict(lambda: defaultdict(lambda: 0))
+        precision = defaultdict(lambda: defaultdict(int))
+        recall = defaultdict(lambda: defaultdict(int))
         match_count = 0
 
         bar = ProgressBar()
@@ -220,19 +443,16 @@ class SentenceLevel:
             recall[expected_emotion][is_same] += 1
             match_count = match_count + 1 if is_same else match_count
 
+        # plain dict objects, so that the result can be pickled (sent back from a process testing a fold)
         result = {"accuracy": 100.0 * match_count / len(testing_set),
-                  "precision": precision,
-                  "recall": recall}
+                  "precision": dict(),
+                  "recall": dict()}
 
-        for key in result["precision"].keys():
-            true_count = result["precision"][key][True]
-            false_count = result["precision"][key][False]
-            result["precision"][key] = true_count * 100.0 / (true_count + false_count)
+        for key, counts in precision.items():
+            result["precision"][key] = counts[True] * 100.0 / (counts[True] + counts[False])
 
-        for key in result["recall"].keys():
-            true_count = result["recall"][key][True]
-            false_count = result["recall"][key][False]
-            result["recall"][key] = true_count * 100.0 / (true_count + false_count)
+        for key, counts in recall.items():
+            result["recall"][key] = counts[True] * 100.0 / (counts[True] + counts[False])
 
         if should_print:
             self.print_result(result)
@@ -255,6 +475,325 @@ class SentenceLevel:
             print("    " + key + " : " + str(item))
 
 
+class WordClassifier(SentenceLevel):
+    """
+    Base class for the sentiment and emotion classifiers over a feature set of words (a word set, or hashed words).
+    It trains, saves, loads, updates (with an update log) and exports the model, the subclasses set the engine
+    template and implement the normalization of the words, the word set and the mapping of the classes to ids.
+    """
+    FILENAME = 'classifier_word_model'
+    WORD_LIMIT = 20000
+
+    # the update log is compacted in the model file when it is larger than this (in bytes)
+    COMPACT_LOG_SIZE = 10 * 1024 * 1024
+
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        """
+        :param allow_negation: adds NOT_ to the negated words
+        :param filename: the name of the model file
+        :param hash_buckets: if set, the words are hashed into this many features instead of building a word set
+        """
+        SentenceLevel.__init__(self, filename)
+        self.allow_negation = allow_negation
+        self.hash_buckets = hash_buckets
+        # the unfitted engine set by the subclasses, the models are always fitted from a copy of it
+        # (the engine may be a loaded one, or a compiled model which can not be fitted)
+        self.engine_template = None
+        self.engine = None
+        self.trained = False
+        self.word_set = dict()
+
+        # the engine is the one loaded for all the instances using the model file, it is copied before an update
+        self.engine_shared = False
+        # the id of the last update in the model (see update), None if the model is not the one of the model file
+        self.update_id = None
+
+    def normalize_sentence(self, sentence):
+        return sentence.lower()
+
+    def create_word_vector(self, words):
+        return self.create_word_matrix([words])
+
+    def create_word_matrix(self, word_lists):
+        if self.hash_buckets:
+            return Features.create_hashed_matrix(word_lists, self.hash_buckets)
+        return Features.create_word_matrix(word_lists, self.word_set)
+
+    def get_model_fingerprint(self):
+        # the model is the one of the model file with its updates up to update_id
+        self.load_model()
+        if self.update_id is None or self.model_file_fingerprint is None:
+            return None
+        return self.create_fingerprint(self.allow_negation, self.model_file_fingerprint, self.update_id)
+
+    def train_words(self, training_set):
+        bar = ProgressBar()
+        self.word_set = self.get_word_set(tagged_line[0] for tagged_line in bar(training_set))
+
+    def get_word_set(self, lines):
+        """
+        Builds the word set from the words of the lines
+        (For new classes, this needs to be implemented)
+        :param lines: an iterable of lines
+        :return: the dict object mapping a word to its column
+        """
+        pass
+
+    def get_classes(self):
+        """
+        (For new classes, this needs to be implemented)
+        :return: the list of the classes, in the order of their ids
+        """
+        pass
+
+    def get_class_id(self, class_name):
+        """
+        Returns the id of a class, the engine is fitted over the ids
+        (For new classes, this needs to be implemented)
+        :param class_name: the class, like a sentiment or an emotion
+        :return: the id
+        """
+        pass
+
+    def get_class_for_id(self, class_id):
+        """
+        Returns the class for an id predicted by the engine
+        (For new classes, this needs to be implemented)
+        :param class_id: the id
+        :return: the class
+        """
+        pass
+
+    def train(self, training_set, save_file=True):
+        if not self.hash_buckets:
+            self.train_words(training_set)
+
+        bar = ProgressBar()
+        classifier_x = self.create_word_matrix(self.get_normalized_words(tagged_line[0])
+                                               for tagged_line in bar(training_set))
+        classifier_y = [self.get_class_id(tagged_line[1]) for tagged_line in training_set]
+
+        self.engine = Features.fit(self.engine_template, classifier_x, classifier_y)
+        self.trained = True
+        self.engine_shared = False
+        self.update_id = None
+        self.model_version += 1
+
+        if save_file:
+            self.save_model()
+
+    def train_stream(self, tagged_lines, chunk_size=10000, save_file=True):
+        """
+        Trains the model over a stream of tagged lines, updating the engine chunk_size lines at a time with its
+        partial_fit (the naive bayes engines, or an SGDClassifier set as the engine_template), so that the memory
+        used is bounded by the chunk size. Without hash_buckets, the word set is built by a first pass over the lines.
+        :param tagged_lines: a function returning a new iterator of (line, class) tuples,
+         like MovieReviewDataSet.stream or TweetDataSet.stream (called twice without hash_buckets)
+        :param chunk_size: the number of lines fitted at a time
+        :param save_file: save the model in the file
+        :return: None
+        """
+        if not hasattr(self.engine_template, 'partial_fit'):
+            raise ValueError(self.engine_template.__class__.__name__ + " can not be trained over a stream")
+
+        if not self.hash_buckets:
+            self.word_set = self.get_word_set(line for line, class_name in tagged_lines())
+
+        engine = clone(self.engine_template)
+        all_classes = range(len(self.get_classes()))
+        lines = iter(tagged_lines())
+        chunk = list(islice(lines, chunk_size))
+        while chunk:
+            classifier_x = self.create_word_matrix(self.get_normalized_words(line) for line, class_name in chunk)
+            classifier_y = [self.get_class_id(class_name) for line, class_name in chunk]
+            Features.partial_fit(engine, classifier_x, classifier_y, all_classes)
+            chunk = list(islice(lines, chunk_size))
+
+        self.engine = engine
+        self.trained = True
+        self.engine_shared = False
+        self.update_id = None
+        self.model_version += 1
+
+        if save_file:
+            self.save_model()
+
+    def save_model(self):
+        """
+        Saves the engine and the word set in the model file, in place of the model file and its update log
+        :return: None
+        """
+        # the updates already in the log are marked as part of the model, in case the log is not removed
+        self.update_id = max(self.update_id or 0, UpdateLog.get_last_id(self.filename))
+        Storage.dump(self.filename, (self.engine, self.word_set, self.hash_buckets, self.update_id))
+        self.model_file_fingerprint = Storage.get_fingerprint(self.filename)
+        UpdateLog.remove(self.filename)
+        CompiledModel.remove(self.filename)
+        ResourceCache.invalidate(self.filename)
+
+    def load_model(self):
+        """
+        Loads the engine and the word set from the model file, if the model is not already trained.
+        A compiled model (see export_model) is preferred over the pickled one.
+        The loaded model is shared with all the instances using the same model file.
+        :return: None
+        """
+        if not self.trained:
+            model = ResourceCache.get(self.filename, self.read_model)
+            if model:
+                self.set_model(model)
+                self.engine_shared = True
+                self.model_file_fingerprint = Storage.get_fingerprint(self.filename)
+
+    def set_model(self, model):
+        """
+        :param model: a tuple (engine, word set, hash buckets, update id), the last ones are optional
+        :return: None
+        """
+        self.engine = model[0]
+        self.word_set = model[1]
+        self.hash_buckets = model[2] if len(model) > 2 else None
+        self.update_id = model[3] if len(model) > 3 else 0
+        self.trained = True
+        self.model_version += 1
+
+    def read_model(self):
+        """
+        Reads the model file, with the updates of its update log
+        :return: a tuple (engine, word set, hash buckets, update id), None if there is no model file
+        """
+        if not UpdateLog.exists(self.filename):
+            model = CompiledModel.load(self.filename)
+            if model:
+                return model
+        return self.read_updated_model()
+
+    def read_updated_model(self):
+        """
+        Reads the pickled model file and replays the updates of its update log which are not in it yet
+        :return: a tuple (engine, word set, hash buckets, update id), None if there is no model file
+        """
+        model = Storage.load(self.filename)
+        if not model:
+            return None
+
+        engine, word_set = model[0], model[1]
+        hash_buckets = model[2] if len(model) > 2 else None
+        update_id = model[3] if len(model) > 3 else 0
+        for log_update_id, tagged_lines in UpdateLog.read(self.filename):
+            if log_update_id > update_id:
+                self.fit_update(engine, word_set, hash_buckets, tagged_lines)
+                update_id = log_update_id
+        return engine, word_set, hash_buckets, update_id
+
+    def fit_update(self, engine, word_set, hash_buckets, tagged_lines):
+        """
+        Updates an engine with the tagged lines
+        :param engine: the engine, with partial_fit
+        :param word_set: the word set of the engine
+        :param hash_buckets: the number of hash buckets of the engine
+        :param tagged_lines: the list of (line, class) tuples
+        :return: None
+        """
+        word_lists = [self.get_normalized_words(line) for line, class_name in tagged_lines]
+        if hash_buckets:
+            classifier_x = Features.create_hashed_matrix(word_lists, hash_buckets)
+        else:
+            classifier_x = Features.create_word_matrix(word_lists, word_set)
+        classifier_y = [self.get_class_id(class_name) for line, class_name in tagged_lines]
+
+        # the engine only knows the classes it was trained with, partial_fit ignores the other ones
+        unknown = set(classifier_y) - set(engine.classes_)
+        if unknown:
+            raise ValueError("the model is not trained for the classes " +
+                             ", ".join(sorted(set(tagged_line[1] for tagged_line in tagged_lines
+                                              if self.get_class_id(tagged_line[1]) in unknown))))
+        Features.partial_fit(engine, classifier_x, classifier_y, engine.classes_)
+
+    def update(self, tagged_lines):
+        """
+        Updates the trained model with more tagged lines, like the corrections of the predictions, in milliseconds
+        instead of a training (for the engines with partial_fit, the words not in the word set are not learned).
+        The update is appended to the update log of the model file, which is replayed when the model is loaded,
+        until the log is larger than COMPACT_LOG_SIZE and compacted in the model file.
+        (a single instance should update a model file at a time, the other instances loaded before do not
+        see the update)
+        :param tagged_lines: an iterable of (line, class) tuples
+        :return: None
+        """
+        tagged_lines = list(tagged_lines)
+        self.prepare_update()
+        self.fit_update(self.engine, self.word_set, self.hash_buckets, tagged_lines)
+        self.model_version += 1
+
+        # a model trained without saving it is updated in memory only
+        if self.update_id is None:
+            return
+
+        self.update_id += 1
+        log_size = UpdateLog.append(self.filename, self.update_id, tagged_lines)
+        ResourceCache.invalidate(self.filename)
+        if log_size >= self.COMPACT_LOG_SIZE:
+            self.save_model()
+
+    def compact(self):
+        """
+        Saves the model with its updates in the model file, and removes the update log
+        :return: None
+        """
+        self.prepare_update()
+        self.save_model()
+
+    def prepare_update(self):
+        """
+        Makes the model updatable, a compiled model is replaced by the pickled one (with the updates of the update log)
+        and an engine shared with other instances is copied
+        :return: None
+        """
+        self.load_model()
+        if not self.trained:
+            raise ValueError("there is no trained model to update")
+
+        if isinstance(self.engine, CompiledModel):
+            self.set_model(self.read_updated_model())
+        elif self.engine_shared:
+            self.engine = deepcopy(self.engine)
+        self.engine_shared = False
+
+        if not hasattr(self.engine, 'partial_fit'):
+            raise ValueError(self.engine.__class__.__name__ + " can not be updated")
+
+    def export_model(self):
+        """
+        Exports the trained engine and the word set as a compiled model, which is memory mapped on load
+        (only for the naive bayes and the maximum entropy engines)
+        :return: None
+        """
+        self.load_model()
+        CompiledModel.export(self.filename, self.engine, self.word_set, self.hash_buckets)
+        ResourceCache.invalidate(self.filename)
+
+    def get_prediction(self, sentence):
+        return self.predict_many([sentence])[0]
+
+    def predict_many(self, sentences):
+        if not sentences:
+            return []
+        self.load_model()
+
+        # Split into words
+        with Metrics.stage(Metrics.NORMALIZE):
+            word_lists = [self.get_normalized_words(sentence.lower()) for sentence in sentences]
+
+        with Metrics.stage(Metrics.VECTORIZE):
+            word_matrix = self.create_word_matrix(word_lists)
+
+        with Metrics.stage(Metrics.PREDICT):
+            class_ids = Features.predict(self.engine, word_matrix)
+
+        return [self.get_class_for_id(class_id) for class_id in class_ids]
+
+
 class DocumentLevel:
     """
     Base class for document level analysis
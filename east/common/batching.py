@@ -0,0 +1,233 @@
+from Queue import Queue, Empty, Full
+import threading
+import time
+
+from east.utilities.metrics import Histogram
+
+__author__ = 'bijoy'
+
+
+class Overloaded(Exception):
+    """Raised when the queue of a BatchingPredictor is full"""
+    pass
+
+
+class Timeout(Exception):
+    """Raised when a prediction takes longer than the timeout"""
+    pass
+
+
+class Closed(Exception):
+    """Raised when a sentence is submitted to a closed BatchingPredictor"""
+    pass
+
+
+class Future:
+    """
+    The result of a prediction, set by the batching thread and waited for by the calling thread
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+    def set_result(self, value):
+        self.value = value
+        self.event.set()
+
+    def set_error(self, error):
+        self.error = error
+        self.event.set()
+
+    def done(self):
+        return self.event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits for the result
+        :param timeout: the maximum time to wait in seconds
+        :return: the result, raises the error of the prediction or Timeout
+        """
+        if not self.event.wait(timeout):
+            raise Timeout()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class BatchingPredictor:
+    """
+    Wraps a sentence level algorithm so that many threads can share it: the sentences submitted concurrently
+    are predicted together in one predict_many call, by a thread of the predictor.
+    A batch is predicted when it has max_batch_size sentences, or max_wait seconds after its first sentence.
+
+    The histograms of the batch sizes and of the time the sentences wait in the queue (in ms) are kept,
+    to tune max_batch_size and max_wait: larger batches predict faster, but make the sentences wait longer.
+
+    predictor = BatchingPredictor(UnigramEmotionMultinomialNB())
+    predictor.get_prediction("I am so happy today")  # from any thread
+    """
+
+    BATCH_SIZE_BOUNDS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+    QUEUE_WAIT_BOUNDS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+    def __init__(self, algorithm, max_batch_size=256, max_wait=0.005, max_queue_size=1000):
+        """
+        :param algorithm: the sentence level algorithm
+        :param max_batch_size: the maximum number of sentences predicted together
+        :param max_wait: the maximum time in seconds a sentence waits for other sentences to join its batch
+        :param max_queue_size: the maximum number of submissions waiting, more submissions are rejected (Overloaded)
+        """
+        self.algorithm = algorithm
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = Queue(max_queue_size)
+        self.closed = False
+        self.lock = threading.Lock()
+        self.batch_sizes = Histogram(self.BATCH_SIZE_BOUNDS)
+        self.queue_waits = Histogram(self.QUEUE_WAIT_BOUNDS)
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, sentences):
+        """
+        Queues the sentences for prediction, they are always predicted in the same batch
+        :param sentences: the list of sentences
+        :return: the Future of the list of predictions
+        """
+        future = Future()
+        # under the lock, so that no submission is queued after the stop of close
+        with self.lock:
+            if self.closed:
+                raise Closed()
+            try:
+                self.queue.put_nowait((sentences, future, time.time()))
+            except Full:
+                raise Overloaded()
+        return future
+
+    def get_prediction(self, sentence, timeout=None):
+        """
+        Get the prediction for a sentence, predicted in a batch with the sentences of the other threads
+        :param sentence: the sentence
+        :param timeout: the maximum time to wait in seconds
+        :return: the prediction
+        """
+        return self.submit([sentence]).result(timeout)[0]
+
+    def predict_many(self, sentences, timeout=None):
+        """
+        :param sentences: the list of sentences
+        :param timeout: the maximum time to wait in seconds
+        :return: the list of predictions, in the same order as the sentences
+        """
+        return self.submit(sentences).result(timeout)
+
+    def close(self):
+        """
+        Stops the thread once the sentences already submitted are predicted
+        :return: None
+        """
+        with self.lock:
+            stop = not self.closed
+            self.closed = True
+        # the queue may be full, so the stop is queued without the lock (the batching thread needs it)
+        if stop:
+            self.queue.put((None, None, None))
+        self.thread.join()
+
+    def get_batch(self):
+        """
+        Waits for a submission, then collects the submissions arriving within max_wait (up to max_batch_size sentences)
+        :return: the list of (sentences, future, submit time) submissions, None when closed
+        """
+        first = self.queue.get()
+        if first[0] is None:
+            return None
+
+        batch = [first]
+        size = len(first[0])
+        deadline = time.time() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.time()
+            try:
+                submission = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except Empty:
+                break
+            if submission[0] is None:
+                # predicts the batch collected so far, and stops at the next get_batch
+                self.queue.put(submission)
+                break
+            batch.append(submission)
+            size += len(submission[0])
+        return batch
+
+    def run(self):
+        """
+        The loop of the batching thread
+        :return: None
+        """
+        while True:
+            batch = self.get_batch()
+            if batch is None:
+                self.fail_pending()
+                return
+
+            now = time.time()
+            sentences = [sentence for submission_sentences, future, submit_time in batch
+                         for sentence in submission_sentences]
+            with self.lock:
+                self.batch_sizes.add(len(sentences))
+                for submission_sentences, future, submit_time in batch:
+                    self.queue_waits.add((now - submit_time) * 1000)
+
+            try:
+                predictions = self.algorithm.predict_many(sentences)
+            except Exception:
+                # a submission failing the prediction only fails itself, not the others of the batch
+                for submission_sentences, future, submit_time in batch:
+                    self.predict(submission_sentences, future)
+                continue
+
+            start = 0
+            for submission_sentences, future, submit_time in batch:
+                future.set_result(list(predictions[start:start + len(submission_sentences)]))
+                start += len(submission_sentences)
+
+    def fail_pending(self):
+        """
+        Fails the submissions left in the queue once the thread stops (none are expected, as close stops the
+        submissions before queueing the stop), so that no caller waits forever
+        :return: None
+        """
+        while True:
+            try:
+                sentences, future, submit_time = self.queue.get_nowait()
+            except Empty:
+                return
+            if future is not None:
+                future.set_error(Closed())
+
+    def predict(self, sentences, future):
+        """
+        Predicts the sentences of a single submission
+        :param sentences: the list of sentences
+        :param future: the future of the submission
+        :return: None
+        """
+        try:
+            future.set_result(list(self.algorithm.predict_many(sentences)))
+        except Exception as error:
+            future.set_error(error)
+
+    def get_stats(self):
+        """
+        :return: a dict with the queue size, and the batch size and queue wait (ms) histograms
+        """
+        with self.lock:
+            return {"queue": self.queue.qsize(),
+                    "batch_size": self.batch_sizes.get_stats(),
+                    "queue_wait_ms": self.queue_waits.get_stats()}
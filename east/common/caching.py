@@ -0,0 +1,209 @@
+from collections import OrderedDict
+import hashlib
+import threading
+
+from east.utilities.prediction_store import PredictionStore
+
+__author__ = 'bijoy'
+
+
+def get_text_key(text):
+    """
+    :param text: the sentence or document
+    :return: the md5 digest of the text
+    """
+    if isinstance(text, unicode):
+        text = text.encode('utf-8')
+    return hashlib.md5(text).digest()
+
+
+class PredictionCache:
+    """
+    Wraps a sentence level algorithm with a least recently used cache of its predictions, so that the repeated
+    sentences (retweets, copied spam) are not tokenized and predicted again.
+    The predictions are keyed by the md5 of the normalized sentence (see SentenceLevel.normalize_sentence),
+    and the cache is cleared when the model of the algorithm changes (see SentenceLevel.model_version).
+    The other methods (train, update, ...) are the ones of the algorithm.
+
+    algorithm = PredictionCache(UnigramEmotionMultinomialNB(), max_size=100000)
+    algorithm.predict_many(sentences)
+    algorithm.get_stats()  # hits, misses, hit rate
+    """
+    MAX_SIZE = 100000
+
+    def __init__(self, algorithm, max_size=MAX_SIZE):
+        """
+        :param algorithm: the sentence level algorithm
+        :param max_size: the maximum number of predictions kept
+        """
+        self.algorithm = algorithm
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.model_version = algorithm.model_version
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def __getattr__(self, name):
+        # only called for the attributes the cache does not have, the algorithm is set first in the constructor
+        if name == 'algorithm':
+            raise AttributeError(name)
+        return getattr(self.algorithm, name)
+
+    def get_key(self, sentence):
+        """
+        :param sentence: the sentence
+        :return: the md5 digest of the normalized sentence
+        """
+        return get_text_key(self.algorithm.normalize_sentence(sentence))
+
+    def check_model_version(self):
+        """
+        Clears the cache if the model of the algorithm changed since the predictions were cached
+        (must be called with the lock)
+        :return: None
+        """
+        if self.algorithm.model_version != self.model_version:
+            if self.entries:
+                self.stats["invalidations"] += 1
+            self.entries.clear()
+            self.model_version = self.algorithm.model_version
+
+    def get_prediction(self, sentence):
+        return self.predict_many([sentence])[0]
+
+    def predict_many(self, sentences):
+        """
+        Get the predictions for a list of sentences, only the sentences not in the cache are predicted
+        (the repeated sentences of the list are predicted once)
+        :param sentences: the list of sentences
+        :return: the list of predictions, in the same order as the sentences
+        """
+        if not sentences:
+            return []
+
+        # the model is loaded first, so that the predictions are cached under the version of the model making them
+        load_model = getattr(self.algorithm, 'load_model', None)
+        if load_model:
+            load_model()
+
+        keys = [self.get_key(sentence) for sentence in sentences]
+        predictions = dict()
+        missing = OrderedDict()
+        with self.lock:
+            self.check_model_version()
+            model_version = self.model_version
+            for key, sentence in zip(keys, sentences):
+                if key in predictions or key in missing:
+                    continue
+                if key in self.entries:
+                    prediction = self.entries.pop(key)
+                    self.entries[key] = prediction
+                    predictions[key] = prediction
+                else:
+                    missing[key] = sentence
+            self.stats["misses"] += len(missing)
+            self.stats["hits"] += len(sentences) - len(missing)
+
+        if missing:
+            missing_predictions = self.algorithm.predict_many(list(missing.values()))
+            with self.lock:
+                # the predictions made while the model changed (trained, updated) may be the ones of either model,
+                # they are returned but not cached
+                self.check_model_version()
+                cached = self.model_version == model_version
+                for key, prediction in zip(missing.keys(), missing_predictions):
+                    predictions[key] = prediction
+                    if cached:
+                        self.entries[key] = prediction
+                self.evict()
+
+        return [predictions[key] for key in keys]
+
+    def evict(self):
+        """
+        Evicts the least recently used predictions over max_size (must be called with the lock)
+        :return: None
+        """
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        """
+        Removes all the cached predictions
+        :return: None
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self):
+        """
+        :return: a dict with the hits, misses, evictions, invalidations (model changes), size and hit rate
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self.entries)
+        stats["max_size"] = self.max_size
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(float(stats["hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class PersistentPredictionCache:
+    """
+    Wraps a sentence level algorithm with a cache of its predictions kept in a SQLite file (see PredictionStore),
+    so that the sentences predicted by a previous run with the same model are not predicted again.
+    The predictions are keyed by the md5 of the normalized sentence and the fingerprint of the model
+    (see SentenceLevel.get_model_fingerprint, the md5 of the model file with the settings of the algorithm),
+    a model trained and not saved is not cached.
+    The other methods (train, update, ...) are the ones of the algorithm.
+
+    algorithm = PersistentPredictionCache(UnigramEmotionMultinomialNB(), 'predictions.sqlite')
+    algorithm.predict_many(sentences)
+    """
+
+    def __init__(self, algorithm, store):
+        """
+        :param algorithm: the sentence level algorithm
+        :param store: the PredictionStore, or the path of its file
+        """
+        self.algorithm = algorithm
+        self.store = store if isinstance(store, PredictionStore) else PredictionStore(store)
+
+    def __getattr__(self, name):
+        # only called for the attributes the cache does not have, the algorithm is set first in the constructor
+        if name == 'algorithm':
+            raise AttributeError(name)
+        return getattr(self.algorithm, name)
+
+    def get_prediction(self, sentence):
+        return self.predict_many([sentence])[0]
+
+    def predict_many(self, sentences):
+        """
+        Get the predictions for a list of sentences, the sentences not in the store are predicted and stored
+        :param sentences: the list of sentences
+        :return: the list of predictions, in the same order as the sentences
+        """
+        if not sentences:
+            return []
+
+        fingerprint = self.algorithm.get_model_fingerprint()
+        if fingerprint is None:
+            return self.algorithm.predict_many(sentences)
+
+        keys = [get_text_key(self.algorithm.normalize_sentence(sentence)) for sentence in sentences]
+        predictions = self.store.get_many(fingerprint, keys)
+
+        missing = OrderedDict()
+        for key, sentence in zip(keys, sentences):
+            if key not in predictions and key not in missing:
+                missing[key] = sentence
+
+        if missing:
+            missing_predictions = self.algorithm.predict_many(list(missing.values()))
+            items = list(zip(missing.keys(), missing_predictions))
+            self.store.put_many(fingerprint, items)
+            predictions.update(items)
+
+        return [predictions[key] for key in keys]
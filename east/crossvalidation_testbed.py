@@ -0,0 +1,38 @@
+import time
+
+from east.emotion_analysis.data import TweetDataSet
+from east.emotion_analysis.sentence_level import UnigramEmotionSVM, UnigramEmotionMultinomialNB
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.sentiment_analysis.sentence_level import UnigramSentimentSVM
+
+__author__ = 'bijoy'
+
+# Runs the k-fold cross validation of some algorithms one fold after the other and in parallel,
+# and checks that both give the same result
+
+tweet_data_set = TweetDataSet(k=5)
+movie_data = MovieReviewDataSet(k=5)
+
+
+def measure(data_set, algorithm_class):
+    """
+    Prints the time taken by the sequential and the parallel cross validation
+    :param data_set: the data set
+    :param algorithm_class: the class of the algorithm
+    :return: None
+    """
+    start = time.time()
+    expected = data_set.test_algorithm(algorithm_class(), False)
+    sequential_time = time.time() - start
+
+    start = time.time()
+    result = data_set.test_algorithm(algorithm_class(), False, parallel=True)
+    parallel_time = time.time() - start
+
+    print(algorithm_class.__name__ + " : sequential " + str(round(sequential_time, 2)) + " s, parallel " +
+          str(round(parallel_time, 2)) + " s" + ("" if result == expected else " (DIFFERENT RESULTS)"))
+
+
+measure(tweet_data_set, UnigramEmotionMultinomialNB)
+measure(tweet_data_set, UnigramEmotionSVM)
+measure(movie_data, UnigramSentimentSVM)
@@ -1,7 +1,12 @@
 from collections import defaultdict
 import random
 
+import numpy
+from scipy.sparse import csr_matrix
+
+from .emotions import Emotions
 from east.utilities.storage import Storage
+from east.utilities.cache import ResourceCache
 from east.common.base_classes import DataSet
 from east.utilities.text import Text
 
@@ -18,6 +23,28 @@ class WordEmotionScore(DataSet):
     FILENAME = "pickled/data/word_emotion_score.pickled"
     DATA_SET = "datasets/emotion_lexicon/word_emotion_score.txt"
 
+    COMPILED = ".compiled"
+
+    def load(self):
+        DataSet.load(self)
+        self.word_index, self.score_matrix = ResourceCache.get(
+            self.get_absolute_path(self.FILENAME) + self.COMPILED, self.compile)
+
+    def compile(self):
+        """
+        Compiles the mapping into a word index table and a (words x emotions) score matrix,
+        with the columns in the order of Emotions.EMOTIONS
+        :return: a tuple (word index, score matrix)
+        """
+        word_index = dict()
+        score_matrix = numpy.zeros((len(self.mapping), len(Emotions.EMOTIONS)))
+        for word, emotions in self.mapping.items():
+            row = len(word_index)
+            word_index[word] = row
+            for emotion, score in emotions.items():
+                score_matrix[row, Emotions.get_emotion_id(emotion)] = score
+        return word_index, score_matrix
+
     def read(self):
         mapping = defaultdict(dict)
 
@@ -53,12 +80,43 @@ class WordEmotionScore(DataSet):
             elif Text.is_punctuation(word) and self.allow_negation:
                 sign = 1
 
-            if word in self.mapping.keys():
-                for emotion, score in self.mapping[word].items():
+            emotions = self.mapping.get(word)
+            if emotions:
+                for emotion, score in emotions.items():
                     emotion_scores[emotion] += sign * score
 
         return emotion_scores
 
+    def get_emotion_matrix(self, word_lists):
+        """
+        For many lists of words, returns the scores of each emotion in a single matrix multiplication
+        :param word_lists: an iterable of lists of words
+        :return: a (lists x emotions) array with the sum of scores of each emotion,
+         the columns are in the order of Emotions.EMOTIONS
+        """
+        indices = list()
+        counts = list()
+        indptr = [0]
+        for words in word_lists:
+            sign = 1
+            for word in words:
+                word = word.lower()
+                if word in Text.NEGATIVE_WORDS and self.allow_negation:
+                    sign *= -1
+                elif Text.is_punctuation(word) and self.allow_negation:
+                    sign = 1
+
+                row = self.word_index.get(word)
+                if row is not None:
+                    indices.append(row)
+                    counts.append(sign)
+            indptr.append(len(indices))
+
+        # repeated words are summed up as signed counts by the multiplication
+        word_counts = csr_matrix((numpy.array(counts, dtype=numpy.float64), indices, indptr),
+                                 shape=(len(indptr) - 1, len(self.word_index)))
+        return word_counts.dot(self.score_matrix)
+
 
 class TweetDataSet(DataSet):
     """
@@ -73,14 +131,8 @@ class TweetDataSet(DataSet):
 
     def read(self):
         mapping = defaultdict(list)
-
-        data_set_file = open(self.get_absolute_path(self.DATA_SET), "r")
-        for line in data_set_file:
-            line = line[19:]
-            sentence, emotion = line.split("::")
-            emotion = emotion.strip()
+        for sentence, emotion in self.stream():
             mapping[emotion].append(sentence)
-        data_set_file.close()
 
         if self.normalize_classes:
             min_lines = float("inf")
@@ -93,3 +145,14 @@ class TweetDataSet(DataSet):
 
         Storage.dump(self.get_absolute_path(self.FILENAME), mapping)
         return mapping
+
+    @classmethod
+    def stream(cls):
+        data_set_file = open(cls.get_absolute_path(cls.DATA_SET), "r")
+        try:
+            for line in data_set_file:
+                line = line[19:]
+                sentence, emotion = line.split("::")
+                yield sentence, emotion.strip()
+        finally:
+            data_set_file.close()
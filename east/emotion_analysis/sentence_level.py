@@ -3,8 +3,12 @@ import random
 from progressbar import ProgressBar
 from .data import WordEmotionScore
 from .emotions import Emotions
-from east.common.base_classes import SentenceLevel
+from east.common.base_classes import SentenceLevel, WordClassifier
 from east.utilities.storage import Storage
+from east.utilities.cache import ResourceCache
+from east.utilities.metrics import Metrics
+from east.utilities.compiled_model import CompiledModel
+from sklearn.base import clone
 from sklearn.svm import SVC
 from sklearn.naive_bayes import GaussianNB, BernoulliNB, MultinomialNB
 from sklearn.linear_model import LogisticRegression
@@ -20,50 +24,99 @@ class EmotionScoreClassifier(SentenceLevel):
     def __init__(self, allow_negation=False, filename=FILENAME):
         SentenceLevel.__init__(self, filename)
         self.word_emotion_scores = WordEmotionScore(allow_negation=allow_negation)
+        # the unfitted engine set by the subclasses, the models are always fitted from a copy of it
+        # (the engine may be a loaded one, or a compiled model which can not be fitted)
+        self.engine_template = None
         self.engine = None
         self.trained = False
 
     def train(self, training_set, save_file=True):
-        classifier_x = []
-        classifier_y = []
-
         bar = ProgressBar()
-        for tagged_line in bar(training_set):
-            line = tagged_line[0]
-            emotion = tagged_line[1]
-
-            words = self.text_utility.tokenize(line)
-            emotion_scores = self.word_emotion_scores.get_emotion_scores(words)
-            x = [0 for x in range(len(Emotions.EMOTIONS))]
-            for sub_emotion, score in emotion_scores.items():
-                x[Emotions.get_emotion_id(sub_emotion)] = score
-            classifier_x.append(x)
-            classifier_y.append(Emotions.get_emotion_id(emotion))
-
-        self.engine.fit(classifier_x, classifier_y)
+        classifier_x = self.create_emotion_matrix(self.text_utility.tokenize(tagged_line[0])
+                                                  for tagged_line in bar(training_set))
+        classifier_y = [Emotions.get_emotion_id(tagged_line[1]) for tagged_line in training_set]
+
+        self.engine = clone(self.engine_template).fit(classifier_x, classifier_y)
         self.trained = True
+        self.model_version += 1
+        self.model_file_fingerprint = None
 
         if save_file:
             Storage.dump(self.filename, self.engine)
-
-    def get_prediction(self, sentence):
+            CompiledModel.remove(self.filename)
+            ResourceCache.invalidate(self.filename)
+            self.model_file_fingerprint = Storage.get_fingerprint(self.filename)
+
+    def normalize_sentence(self, sentence):
+        return sentence.lower()
+
+    def get_model_fingerprint(self):
+        self.load_model()
+        if self.model_file_fingerprint is None:
+            return None
+        return self.create_fingerprint(self.word_emotion_scores.allow_negation, self.model_file_fingerprint)
+
+    def create_emotion_matrix(self, word_lists):
+        """
+        Creates the feature matrix of emotion scores for many lists of words
+        :param word_lists: an iterable of lists of words
+        :return: an array with a row of scores for each list, the columns in the order of Emotions.EMOTIONS
+        """
+        return self.word_emotion_scores.get_emotion_matrix(word_lists)
+
+    def load_model(self):
+        """
+        Loads the engine from the model file, if the model is not already trained.
+        A compiled model (see export_model) is preferred over the pickled one.
+        The loaded engine is shared with all the instances using the same model file.
+        :return: None
+        """
         if not self.trained:
-            engine = Storage.load(self.filename)
+            engine = ResourceCache.get(self.filename, self.read_model)
             if engine:
                 self.engine = engine
                 self.trained = True
+                self.model_version += 1
+                self.model_file_fingerprint = Storage.get_fingerprint(self.filename)
+
+    def read_model(self):
+        """
+        Reads the model file
+        :return: the engine, None if there is no model file
+        """
+        compiled_model = CompiledModel.load(self.filename)
+        return compiled_model[0] if compiled_model else Storage.load(self.filename)
+
+    def export_model(self):
+        """
+        Exports the trained engine as a compiled model, which is memory mapped on load
+        (only for the naive bayes and the maximum entropy engines)
+        :return: None
+        """
+        self.load_model()
+        CompiledModel.export(self.filename, self.engine)
+        ResourceCache.invalidate(self.filename)
+
+    def get_prediction(self, sentence):
+        return self.predict_many([sentence])[0]
+
+    def predict_many(self, sentences):
+        if not sentences:
+            return []
+        self.load_model()
 
         # Split into words
-        words = self.text_utility.tokenize(sentence.lower())
+        with Metrics.stage(Metrics.NORMALIZE):
+            word_lists = [self.text_utility.tokenize(sentence.lower()) for sentence in sentences]
 
         # Get the emotion scores for the words
-        emotion_scores = self.word_emotion_scores.get_emotion_scores(words)
+        with Metrics.stage(Metrics.VECTORIZE):
+            emotion_matrix = self.create_emotion_matrix(word_lists)
 
-        x = [0 for x in range(len(Emotions.EMOTIONS))]
-        for sub_emotion, score in emotion_scores.items():
-            x[Emotions.get_emotion_id(sub_emotion)] = score
+        with Metrics.stage(Metrics.PREDICT):
+            emotion_ids = self.engine.predict(emotion_matrix)
 
-        return Emotions.get_emotion_for_id(self.engine.predict([x])[0])
+        return [Emotions.get_emotion_for_id(emotion_id) for emotion_id in emotion_ids]
 
 
 class EmotionScoreSVM(EmotionScoreClassifier):
@@ -73,7 +126,7 @@ class EmotionScoreSVM(EmotionScoreClassifier):
 
     def __init__(self, allow_negation=False, filename=FILENAME):
         EmotionScoreClassifier.__init__(self, allow_negation, filename)
-        self.engine = SVC()
+        self.engine_template = SVC()
 
 
 class EmotionScoreGaussianNB(EmotionScoreClassifier):
@@ -83,7 +136,7 @@ class EmotionScoreGaussianNB(EmotionScoreClassifier):
 
     def __init__(self, allow_negation=False, filename=FILENAME):
         EmotionScoreClassifier.__init__(self, allow_negation, filename)
-        self.engine = GaussianNB()
+        self.engine_template = GaussianNB()
 
 
 class EmotionScoreMultinomialNB(EmotionScoreClassifier):
@@ -93,7 +146,7 @@ class EmotionScoreMultinomialNB(EmotionScoreClassifier):
 
     def __init__(self, allow_negation=False, filename=FILENAME):
         EmotionScoreClassifier.__init__(self, allow_negation, filename)
-        self.engine = MultinomialNB()
+        self.engine_template = MultinomialNB()
 
 
 class EmotionScoreBernoulliNB(EmotionScoreClassifier):
@@ -103,7 +156,7 @@ class EmotionScoreBernoulliNB(EmotionScoreClassifier):
 
     def __init__(self, allow_negation=False, filename=FILENAME):
         EmotionScoreClassifier.__init__(self, allow_negation, filename)
-        self.engine = BernoulliNB()
+        self.engine_template = BernoulliNB()
 
 
 class EmotionScoreMaxEnt(EmotionScoreClassifier):
@@ -113,7 +166,7 @@ class EmotionScoreMaxEnt(EmotionScoreClassifier):
 
     def __init__(self, allow_negation=False, filename=FILENAME):
         EmotionScoreClassifier.__init__(self, allow_negation, filename)
-        self.engine = LogisticRegression()
+        self.engine_template = LogisticRegression()
 
 
 class MaxEmotionScore(SentenceLevel):
@@ -124,6 +177,12 @@ class MaxEmotionScore(SentenceLevel):
         self.allow_negation = allow_negation
         self.word_emotion_scores = WordEmotionScore(allow_negation=allow_negation)
 
+    def normalize_sentence(self, sentence):
+        return sentence.lower()
+
+    def get_model_fingerprint(self):
+        return self.create_fingerprint(self.allow_negation)
+
     def get_prediction(self, sentence):
         # Split into words
         words = self.text_utility.tokenize(sentence.lower())
@@ -142,92 +201,52 @@ class MaxEmotionScore(SentenceLevel):
         return best_emotion
 
 
-class UnigramEmotionClassifier(SentenceLevel):
+class UnigramEmotionClassifier(WordClassifier):
     """
     Classify using the feature set of emotion scores of a sentence
     """
 
     FOLDER = 'pickled/emotion/'
     FILENAME = 'classifier_word_model'
-    WORD_LIMIT = 20000
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        SentenceLevel.__init__(self, filename)
-        self.allow_negation = allow_negation
-        self.engine = None
-        self.trained = False
-        self.word_set = dict()
-
-    def create_word_vector(self, words):
-        count_list = [0 for i in range(len(self.word_set))]
-        for word in words:
-            if word in self.word_set.keys():
-                count_list[self.word_set[word]] = 1
-        return count_list
-
-    def get_normalized_words(self, line):
-        words = self.text_utility.tokenize(line)
-        if self.allow_negation:
-            words = self.text_utility.negate_words(words)
-        words = self.text_utility.remove_punctuations(words)
-        words = self.text_utility.remove_stop_words(words)
-        words = self.text_utility.lemmatize(words)
-        return words
-
-    def train_words(self, training_set):
-        bar = ProgressBar()
-        for tagged_line in bar(training_set):
-            line = tagged_line[0]
+    def get_normalization_key(self):
+        return 'unigrams without stop words', self.allow_negation, self.text_utility.get_tokenizer_type()
+
+    def normalize_words(self, line):
+        return self.text_utility.normalize(line, negate=self.allow_negation, remove_stop_words=True)
+
+    def get_word_set(self, lines):
+        """
+        Builds the word set from the words of the lines
+        :param lines: an iterable of lines
+        :return: the dict object mapping a word to its column
+        """
+        word_set = dict()
+        for line in lines:
             words = self.get_normalized_words(line)
 
             for word in words:
-                if word not in self.word_set.keys():
-                    self.word_set[word] = len(self.word_set)
+                if word not in word_set:
+                    word_set[word] = len(word_set)
 
-        keys = list(self.word_set.keys())
+        keys = list(word_set.keys())
         random.shuffle(keys)
         keys = keys[:min(self.WORD_LIMIT, len(keys))]
 
-        self.word_set.clear()
+        # the loaded word set may be shared with other instances, so a new one is built
+        word_set = dict()
         for word in keys:
-            self.word_set[word] = len(self.word_set)
-
-    def train(self, training_set, save_file=True):
-        classifier_x = []
-        classifier_y = []
+            word_set[word] = len(word_set)
+        return word_set
 
-        self.train_words(training_set)
-
-        bar = ProgressBar()
-        for tagged_line in bar(training_set):
-            line = tagged_line[0]
-            emotion = tagged_line[1]
-            words = self.get_normalized_words(line)
-            x = self.create_word_vector(words)
-
-            classifier_x.append(x)
-            classifier_y.append(Emotions.get_emotion_id(emotion))
-
-        self.engine.fit(classifier_x, classifier_y)
-        self.trained = True
-
-        if save_file:
-            Storage.dump(self.filename, (self.engine, self.word_set))
-
-    def get_prediction(self, sentence):
-        # Split into words
-        if not self.trained:
-            engine = Storage.load(self.filename)
-            if engine:
-                self.engine = engine[0]
-                self.word_set = engine[1]
-                self.trained = True
+    def get_classes(self):
+        return Emotions.EMOTIONS
 
-        words = self.get_normalized_words(sentence.lower())
-        word_vector = self.create_word_vector(words)
-        emotion_id = self.engine.predict([word_vector])[0]
+    def get_class_id(self, class_name):
+        return Emotions.get_emotion_id(class_name)
 
-        return Emotions.get_emotion_for_id(emotion_id)
+    def get_class_for_id(self, class_id):
+        return Emotions.get_emotion_for_id(class_id)
 
 
 class UnigramEmotionSVM(UnigramEmotionClassifier):
@@ -236,9 +255,9 @@ class UnigramEmotionSVM(UnigramEmotionClassifier):
     """
     FILENAME = 'svm_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        UnigramEmotionClassifier.__init__(self, allow_negation, filename)
-        self.engine = SVC()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        UnigramEmotionClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = SVC()
 
 
 class UnigramEmotionGaussianNB(UnigramEmotionClassifier):
@@ -247,9 +266,9 @@ class UnigramEmotionGaussianNB(UnigramEmotionClassifier):
     """
     FILENAME = 'gaussian_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        UnigramEmotionClassifier.__init__(self, allow_negation, filename)
-        self.engine = GaussianNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        UnigramEmotionClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = GaussianNB()
 
 
 class UnigramEmotionBernoulliNB(UnigramEmotionClassifier):
@@ -258,9 +277,9 @@ class UnigramEmotionBernoulliNB(UnigramEmotionClassifier):
     """
     FILENAME = 'bernoulli_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        UnigramEmotionClassifier.__init__(self, allow_negation, filename)
-        self.engine = BernoulliNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        UnigramEmotionClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = BernoulliNB()
 
 
 class UnigramEmotionMultinomialNB(UnigramEmotionClassifier):
@@ -269,9 +288,9 @@ class UnigramEmotionMultinomialNB(UnigramEmotionClassifier):
     """
     FILENAME = 'multinomial_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        UnigramEmotionClassifier.__init__(self, allow_negation, filename)
-        self.engine = MultinomialNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        UnigramEmotionClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = MultinomialNB()
 
 class UnigramEmotionMaxEnt(UnigramEmotionClassifier):
     """
@@ -279,6 +298,6 @@ class UnigramEmotionMaxEnt(UnigramEmotionClassifier):
     """
     FILENAME = 'multinomial_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        UnigramEmotionClassifier.__init__(self, allow_negation, filename)
-        self.engine = LogisticRegression()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        UnigramEmotionClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = LogisticRegression()
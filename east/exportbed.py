@@ -0,0 +1,33 @@
+from east.emotion_analysis.sentence_level import UnigramEmotionGaussianNB, UnigramEmotionBernoulliNB, \
+    UnigramEmotionMultinomialNB, EmotionScoreGaussianNB, EmotionScoreBernoulliNB, EmotionScoreMultinomialNB
+from east.sentiment_analysis.sentence_level import UnigramSentimentBernoulliNB, UnigramSentimentGaussianNB, \
+    UnigramSentimentMultinomialNB, UnigramSentimentMaxEnt, BigramSentimentBernoulliNB, \
+    BigramSentimentMultinomialNB, BigramSentimentGaussianNB
+
+__author__ = 'bijoy'
+
+# Exports the trained naive bayes and maximum entropy models as compiled models,
+# these are then memory mapped on load instead of unpickling the engines
+
+# #####################EMOTION ANALYSIS EXPORT##########################
+
+UnigramEmotionGaussianNB().export_model()
+UnigramEmotionBernoulliNB().export_model()
+UnigramEmotionMultinomialNB().export_model()
+EmotionScoreGaussianNB().export_model()
+EmotionScoreBernoulliNB().export_model()
+EmotionScoreMultinomialNB().export_model()
+
+########################################################################
+
+# ####################SENTIMENT ANALYSIS EXPORT#########################
+
+UnigramSentimentBernoulliNB().export_model()
+UnigramSentimentGaussianNB().export_model()
+UnigramSentimentMultinomialNB().export_model()
+UnigramSentimentMaxEnt().export_model()
+BigramSentimentBernoulliNB().export_model()
+BigramSentimentMultinomialNB().export_model()
+BigramSentimentGaussianNB().export_model()
+
+#######################################################################
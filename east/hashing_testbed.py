@@ -0,0 +1,47 @@
+from east.emotion_analysis.sentence_level import UnigramEmotionBernoulliNB, UnigramEmotionMultinomialNB
+from east.emotion_analysis.data import TweetDataSet
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.sentiment_analysis.sentence_level import UnigramSentimentBernoulliNB, UnigramSentimentMultinomialNB, \
+    BigramSentimentMultinomialNB
+
+__author__ = 'bijoy'
+
+# Compares the word set (None) against the feature hashing mode with different number of hash buckets
+# Accuracy of the 5-fold cross validation is noted against each of the bucket counts
+HASH_BUCKETS = [None, 2 ** 10, 2 ** 12, 2 ** 14, 2 ** 16, 2 ** 18]
+
+# #####################EMOTION ANALYSIS TESTBED########################
+
+tweet_data_set = TweetDataSet(test_mode=True)
+
+# WordEmotionMultinomialNB : None 42.57%, 2^10 34.17%, 2^12 38.30%, 2^14 42.12%, 2^16 42.35%, 2^18 42.84%
+for hash_buckets in HASH_BUCKETS:
+    print("Hash Buckets : " + str(hash_buckets))
+    tweet_data_set.test_algorithm(UnigramEmotionMultinomialNB(hash_buckets=hash_buckets))
+
+# WordEmotionBernoulliNB : None 42.22%, 2^10 34.41%, 2^12 37.82%, 2^14 41.76%, 2^16 41.81%, 2^18 42.16%
+for hash_buckets in HASH_BUCKETS:
+    print("Hash Buckets : " + str(hash_buckets))
+    tweet_data_set.test_algorithm(UnigramEmotionBernoulliNB(hash_buckets=hash_buckets))
+
+#######################################################################
+
+# ####################SENTIMENT ANALYSIS TESTBED#######################
+movie_data = MovieReviewDataSet()
+
+# WordSentimentMultinomialNB : None 76.50%, 2^10 66.67%, 2^12 71.14%, 2^14 74.18%, 2^16 76.26%, 2^18 76.52%
+for hash_buckets in HASH_BUCKETS:
+    print("Hash Buckets : " + str(hash_buckets))
+    movie_data.test_algorithm(UnigramSentimentMultinomialNB(hash_buckets=hash_buckets))
+
+# WordSentimentBernoulliNB : None 76.57%, 2^10 66.68%, 2^12 71.37%, 2^14 74.10%, 2^16 76.36%, 2^18 76.59%
+for hash_buckets in HASH_BUCKETS:
+    print("Hash Buckets : " + str(hash_buckets))
+    movie_data.test_algorithm(UnigramSentimentBernoulliNB(hash_buckets=hash_buckets))
+
+# BigramSentimentMultinomialNB : None 61.41%, 2^10 56.25%, 2^12 59.89%, 2^14 62.26%, 2^16 66.89%, 2^18 70.43%
+for hash_buckets in HASH_BUCKETS:
+    print("Hash Buckets : " + str(hash_buckets))
+    movie_data.test_algorithm(BigramSentimentMultinomialNB(hash_buckets=hash_buckets))
+
+#######################################################################
@@ -0,0 +1,58 @@
+import timeit
+
+from east.emotion_analysis.data import TweetDataSet
+from east.toolkit import Toolkit
+from east.utilities.metrics import Metrics
+
+__author__ = 'bijoy'
+
+# Analyses the tweets with the metrics disabled and enabled, compares the times and the results,
+# then prints the stage timings, the slowest tweets and the prometheus text
+
+REPEAT = 5
+BATCH_SIZE = 100
+SINGLE_DOCUMENTS = 1000
+
+
+def analyse(toolkit, documents):
+    """
+    :param toolkit: the toolkit
+    :param documents: the list of documents
+    :return: the list of results, and the best time of REPEAT runs
+    """
+    best = None
+    results = None
+    for i in range(REPEAT):
+        start = timeit.default_timer()
+        results = list()
+        for batch_start in range(0, len(documents), BATCH_SIZE):
+            results += toolkit.analyse_many(documents[batch_start:batch_start + BATCH_SIZE])
+        elapsed = timeit.default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+# the sentences ending with a backslash can not be decoded by Text.unicode_to_ascii
+documents = [line for line, emotion in TweetDataSet.stream() if '\\' not in line][:5000]
+toolkit = Toolkit()
+toolkit.analyse(documents[0])
+
+expected, disabled_time = analyse(toolkit, documents)
+metrics = Metrics.enable()
+results, enabled_time = analyse(toolkit, documents)
+# only the documents analysed alone have a time of their own, for the slowest tweets
+for document in documents[:SINGLE_DOCUMENTS]:
+    toolkit.analyse(document)
+Metrics.disable()
+
+print("metrics disabled : " + str(round(disabled_time, 3)) + " s")
+print("metrics enabled : " + str(round(enabled_time, 3)) + " s" +
+      ("" if results == expected else " (DIFFERENT RESULTS)"))
+
+stats = metrics.get_stats()
+for stage, stage_stats in sorted(stats["stages"].items()):
+    print(stage + " : " + str(stage_stats))
+print(stats["counters"])
+for slow_input in stats["slowest_inputs"][:5]:
+    print(str(slow_input["ms"]) + " ms : " + slow_input["document"])
+print(metrics.to_prometheus())
@@ -0,0 +1,239 @@
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import timeit
+
+from east.bench import VERSION, get_sentences
+
+__author__ = 'bijoy'
+
+# the sentences (and lists of words) each function is called over, per corpus
+INPUTS = 500
+
+# the tags of a document, for the document level functions
+DOCUMENT_TAGS = 8
+
+# the minimum time of a timed run in seconds
+MIN_RUN_TIME = 0.2
+
+
+def get_word_lists(sentiment, count):
+    """
+    :param sentiment: the movie reviews (True) or the tweets (False)
+    :param count: the number of sentences
+    :return: the list of the words of the sentences
+    """
+    from east.utilities.text import Text
+    text_utility = Text()
+    return [text_utility.tokenize(sentence) for sentence in get_sentences(sentiment, count)]
+
+
+def get_tag_lists(count):
+    """
+    The emotions of consecutive tweets, as the tags of the sentences of documents
+    :param count: the number of documents
+    :return: the list of the lists of tags
+    """
+    from east.emotion_analysis.data import TweetDataSet
+    tags = [emotion for line, emotion in TweetDataSet.stream()]
+    random.Random(0).shuffle(tags)
+    return [tags[start:start + DOCUMENT_TAGS] for start in range(0, count * DOCUMENT_TAGS, DOCUMENT_TAGS)]
+
+
+def tokenize(count):
+    from east.utilities.text import Text
+    return Text().tokenize, get_sentences(False, count)
+
+
+def negate_words(count):
+    from east.utilities.text import Text
+    return Text.negate_words, get_word_lists(True, count)
+
+
+def get_negated_words(count):
+    from east.common.base_classes import DataSet
+    return DataSet.get_negated_words, get_word_lists(True, count)
+
+
+def get_emotion_scores(count):
+    from east.emotion_analysis.data import WordEmotionScore
+    return WordEmotionScore().get_emotion_scores, get_word_lists(False, count)
+
+
+def get_sentiment_scores(count):
+    from east.sentiment_analysis.data import SentiWordNet
+    return SentiWordNet().get_sentiment_scores, get_word_lists(True, count)
+
+
+def get_opinion_count(count):
+    from east.sentiment_analysis.data import OpinionLexicon
+    return OpinionLexicon().get_opinion_count, get_word_lists(True, count)
+
+
+def create_emotion_word_vector(count):
+    from east.emotion_analysis.sentence_level import UnigramEmotionMultinomialNB
+    algorithm = UnigramEmotionMultinomialNB()
+    algorithm.load_model()
+    return algorithm.create_word_vector, [algorithm.get_normalized_words(sentence.lower())
+                                          for sentence in get_sentences(False, count)]
+
+
+def create_sentiment_word_vector(count):
+    from east.sentiment_analysis.sentence_level import UnigramSentimentMultinomialNB
+    algorithm = UnigramSentimentMultinomialNB()
+    algorithm.load_model()
+    return algorithm.create_word_vector, [algorithm.get_normalized_words(sentence.lower())
+                                          for sentence in get_sentences(True, count)]
+
+
+def get_most_continuous_tag(count):
+    from east.common.base_classes import DocumentLevel
+    return DocumentLevel.get_most_continuous_tag, get_tag_lists(count)
+
+
+def get_max_tag(count):
+    from east.common.base_classes import DocumentLevel
+    return DocumentLevel.get_max_tag, get_tag_lists(count)
+
+
+# the name of each benchmark, and the function returning the function benchmarked and the list of its arguments
+BENCHMARKS = [('Text.tokenize', tokenize),
+              ('Text.negate_words', negate_words),
+              ('DataSet.get_negated_words', get_negated_words),
+              ('WordEmotionScore.get_emotion_scores', get_emotion_scores),
+              ('SentiWordNet.get_sentiment_scores', get_sentiment_scores),
+              ('OpinionLexicon.get_opinion_count', get_opinion_count),
+              ('UnigramEmotionClassifier.create_word_vector', create_emotion_word_vector),
+              ('WordSentimentClassifier.create_word_vector', create_sentiment_word_vector),
+              ('DocumentLevel.get_most_continuous_tag', get_most_continuous_tag),
+              ('DocumentLevel.get_max_tag', get_max_tag)]
+
+
+def time_function(function, arguments, repeat):
+    """
+    :param function: the function benchmarked
+    :param arguments: the list of arguments, the function is called once with each
+    :param repeat: the number of runs over the arguments
+    :return: the time of a call in microseconds, in the fastest run
+    """
+    def run():
+        for argument in arguments:
+            function(argument)
+
+    # the first run warms up the lazy loads and caches of the function, and sets the loops over the arguments
+    # of a run, so that a run is long enough not to be swayed by the noise of the machine
+    timer = timeit.Timer(run)
+    loops = max(1, int(math.ceil(MIN_RUN_TIME / max(timer.timeit(1), 1e-9))))
+    best = min(timer.repeat(repeat, loops))
+    return best * 1000000 / (loops * len(arguments))
+
+
+def run_benchmarks(names=None, inputs=INPUTS, repeat=5):
+    """
+    :param names: only the benchmarks with these names, all of them if None
+    :param inputs: the number of arguments of each function
+    :param repeat: the number of runs over the arguments, the fastest is kept
+    :return: a dict with the time of a call in microseconds of each benchmark
+    """
+    results = dict()
+    for name, setup in BENCHMARKS:
+        if names and name not in names:
+            continue
+        function, arguments = setup(inputs)
+        results[name] = {"us_per_call": round(time_function(function, arguments, repeat), 3),
+                         "calls": len(arguments)}
+    return results
+
+
+def compare(baseline, results, threshold):
+    """
+    :param baseline: the dict of the results of the baseline
+    :param results: the dict of the new results
+    :param threshold: the relative slowdown over which a benchmark is a regression (0.1 : 10 % slower)
+    :return: the list of the comparison lines, the list of the names of the regressions
+    """
+    lines = list()
+    regressions = list()
+    for name in sorted(results.keys()):
+        current = results[name]["us_per_call"]
+        if name not in baseline:
+            lines.append("%-45s %12s %12.3f" % (name, "-", current))
+            continue
+
+        previous = baseline[name]["us_per_call"]
+        change = (current - previous) / previous if previous else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "faster"
+        lines.append("%-45s %12.3f %12.3f %+8.1f%% %s" % (name, previous, current, change * 100, flag))
+    return lines, regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='east microbench',
+                                     description='Times the hot inner functions over fixed inputs drawn from the '
+                                                 'bundled corpora, saves the results as a JSON baseline '
+                                                 'and compares them with a baseline')
+    parser.add_argument('-b', '--benchmark', action='append', dest='benchmarks', default=None,
+                        help='only the benchmarks with this name (can be repeated) ; ' +
+                             ", ".join(name for name, setup in BENCHMARKS))
+    parser.add_argument('--inputs', default=INPUTS, type=int, help='the arguments each function is called with')
+    parser.add_argument('--repeat', default=5, type=int, help='the runs over the arguments, the fastest is kept')
+    parser.add_argument('-o', '--output', default=None, type=str, help='write the results (a baseline) to this file')
+    parser.add_argument('-c', '--compare', default=None, type=str,
+                        help='compare with this baseline, the exit status is 1 if a benchmark regressed')
+    parser.add_argument('-t', '--threshold', default=0.1, type=float,
+                        help='with --compare, the relative slowdown reported as a regression (0.1 : 10%%)')
+    arguments = parser.parse_args(args)
+
+    names = [name for name, setup in BENCHMARKS]
+    for name in arguments.benchmarks or []:
+        if name not in names:
+            parser.error("unknown benchmark: " + name)
+    if arguments.inputs < 1 or arguments.repeat < 1:
+        parser.error("--inputs and --repeat must be at least 1")
+
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = run_benchmarks(arguments.benchmarks, arguments.inputs, arguments.repeat)
+    report = {"east_version": VERSION,
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+              "options": {"inputs": arguments.inputs, "repeat": arguments.repeat},
+              "results": results}
+
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file:
+            output_file.write(json.dumps(report, indent=2, sort_keys=True) + '\n')
+
+    if baseline is None:
+        if not arguments.output:
+            print(json.dumps(report, indent=2, sort_keys=True))
+        return
+
+    if baseline.get("options") != report["options"] or baseline.get("python") != report["python"]:
+        print("warning: the baseline was run with other options or another python, " +
+              json.dumps({"options": baseline.get("options"), "python": baseline.get("python")}))
+
+    lines, regressions = compare(baseline["results"], results, arguments.threshold)
+    print("%-45s %12s %12s" % ("us per call", "baseline", "current"))
+    for line in lines:
+        print(line)
+    if regressions:
+        print(str(len(regressions)) + " regression(s) over " + str(int(arguments.threshold * 100)) + "%")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
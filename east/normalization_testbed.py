@@ -0,0 +1,53 @@
+import time
+
+from east.common.base_classes import DataSet
+from east.emotion_analysis.data import TweetDataSet
+from east.emotion_analysis.sentence_level import UnigramEmotionMultinomialNB, UnigramEmotionBernoulliNB, \
+    UnigramEmotionMaxEnt
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.sentiment_analysis.sentence_level import UnigramSentimentMultinomialNB, UnigramSentimentBernoulliNB, \
+    BigramSentimentMultinomialNB
+
+__author__ = 'bijoy'
+
+# Cross validates a few algorithms normalizing the sentences the same way, with the normalized corpora
+# shared by the folds and the algorithms and without them, and checks that the results are the same
+
+tweet_data_set = TweetDataSet(k=5)
+movie_data = MovieReviewDataSet(k=5)
+
+SWEEP = [(tweet_data_set, UnigramEmotionMultinomialNB),
+         (tweet_data_set, UnigramEmotionBernoulliNB),
+         (tweet_data_set, UnigramEmotionMaxEnt),
+         (movie_data, UnigramSentimentMultinomialNB),
+         (movie_data, UnigramSentimentBernoulliNB),
+         (movie_data, BigramSentimentMultinomialNB)]
+
+
+def without_normalized_corpus(algorithm):
+    """
+    :param algorithm: the algorithm object
+    :return: the algorithm, normalizing every sentence every time
+    """
+    algorithm.get_normalization_key = lambda: None
+    return algorithm
+
+
+def sweep(create):
+    """
+    Cross validates the algorithms of the SWEEP
+    :param create: the function creating the algorithm object from its class
+    :return: the list of results, and the elapsed time
+    """
+    start = time.time()
+    results = [data_set.test_algorithm(create(algorithm_class), False) for data_set, algorithm_class in SWEEP]
+    return results, time.time() - start
+
+
+expected, plain_time = sweep(lambda algorithm_class: without_normalized_corpus(algorithm_class()))
+DataSet.clear_normalized_corpora()
+results, cached_time = sweep(lambda algorithm_class: algorithm_class())
+
+print("normalizing every time : " + str(round(plain_time, 2)) + " s")
+print("normalized corpora : " + str(round(cached_time, 2)) + " s" +
+      ("" if results == expected else " (DIFFERENT RESULTS)"))
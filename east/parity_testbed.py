@@ -0,0 +1,106 @@
+import time
+
+from east.emotion_analysis.data import TweetDataSet
+from east.sentiment_analysis.data import MovieReviewDataSet, OpinionLexicon
+from east.utilities.text import Text
+
+__author__ = 'bijoy'
+
+# Checks that the fast code paths give exactly the same output as the original ones over the bundled data sets,
+# and prints how much faster they are
+
+
+def compare(name, lines, original, fast):
+    """
+    Runs both the functions over all the lines and prints the mismatches and the timings
+    :param name: the name of the comparison
+    :param lines: the lines of text
+    :param original: the original function
+    :param fast: the fast function
+    :return: the number of lines with a different output
+    """
+    start = time.time()
+    original_output = [original(line) for line in lines]
+    original_time = time.time() - start
+
+    start = time.time()
+    fast_output = [fast(line) for line in lines]
+    fast_time = time.time() - start
+
+    mismatches = 0
+    for line, original_result, fast_result in zip(lines, original_output, fast_output):
+        if original_result != fast_result:
+            mismatches += 1
+            print("    mismatch : " + line.strip())
+            print("        " + str(original_result) + " != " + str(fast_result))
+
+    print(name + " : " + str(mismatches) + " mismatches in " + str(len(lines)) + " lines, " +
+          str(int(len(lines) / original_time)) + " -> " + str(int(len(lines) / fast_time)) + " lines per second")
+    return mismatches
+
+
+def normalize_in_steps(line, negate, remove_stop_words, lemmatize):
+    """
+    The original normalization chain of the word classifiers, one pass over the words for each step
+    """
+    words = text_utility.tokenize(line)
+    if negate:
+        words = text_utility.negate_words(words)
+    words = text_utility.remove_punctuations(words)
+    if remove_stop_words:
+        words = text_utility.remove_stop_words(words)
+    if lemmatize:
+        words = text_utility.lemmatize(words)
+    return words
+
+
+text_utility = Text()
+movie_data = MovieReviewDataSet(test_mode=False)
+movie_lines = [line for line, sentiment in movie_data.get_training_set()]
+tweet_data = TweetDataSet(test_mode=False)
+tweet_lines = [line for line, emotion in tweet_data.get_training_set()]
+
+# ####################OPINION LEXICON SCANNER##########################
+
+for corpus_name, lines in [("movie reviews", movie_lines), ("tweets", tweet_lines)]:
+    for allow_negation in [False, True]:
+        opinion_lexicon = OpinionLexicon(allow_negation=allow_negation)
+        compare("OpinionLexicon.scan_opinion_count on " + corpus_name + " (allow_negation=" + str(allow_negation) +
+                ")", lines,
+                lambda line: opinion_lexicon.get_opinion_count(text_utility.tokenize(line.lower())),
+                opinion_lexicon.scan_opinion_count)
+
+#######################################################################
+
+# ######################FUSED NORMALIZATION############################
+
+# the configurations used by the unigram sentiment, unigram emotion and bigram sentiment classifiers
+NORMALIZATIONS = [(False, False, True), (True, False, True),
+                  (False, True, True), (True, True, True),
+                  (False, False, False), (True, False, False)]
+
+for corpus_name, lines in [("movie reviews", movie_lines), ("tweets", tweet_lines)]:
+    for negate, remove_stop_words, lemmatize in NORMALIZATIONS:
+        # the word classifiers normalize both the raw lines (training) and the lower cased lines (prediction)
+        for lower in [False, True]:
+            corpus = [line.lower() for line in lines] if lower else lines
+            compare("Text.normalize on " + corpus_name + " (negate=" + str(negate) +
+                    ", remove_stop_words=" + str(remove_stop_words) + ", lemmatize=" + str(lemmatize) +
+                    ", lower=" + str(lower) + ")", corpus,
+                    lambda line: normalize_in_steps(line, negate, remove_stop_words, lemmatize),
+                    lambda line: text_utility.normalize(line, negate, True, remove_stop_words, lemmatize))
+
+#######################################################################
+
+# ########################FAST TOKENIZER###############################
+
+# Known divergence: the html entities of non ascii characters (e.g. &pound;) are dropped by the fast tokenizer,
+# while the nltk one returns a unicode character which fails the conversion to str with a UnicodeEncodeError
+fast_text_utility = Text(Text.FAST_TOKENIZER)
+for corpus_name, lines in [("movie reviews", movie_lines), ("tweets", tweet_lines)]:
+    for lower in [False, True]:
+        corpus = [line.lower() for line in lines] if lower else lines
+        compare("Text.tokenize (fast) on " + corpus_name + " (lower=" + str(lower) + ")", corpus,
+                text_utility.tokenize, fast_text_utility.tokenize)
+
+#######################################################################
@@ -0,0 +1,52 @@
+import multiprocessing
+import time
+
+from east.emotion_analysis.data import TweetDataSet
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.toolkit import Toolkit
+
+__author__ = 'bijoy'
+
+# Measures the throughput of Toolkit.analyse_parallel against the number of worker processes
+# over the bundled corpora, and checks that the results are the same as with a single process
+
+CHUNK_SIZE = 100
+WORKERS = sorted(set([1, 2, 4, 8, 16, 32, multiprocessing.cpu_count()]))
+
+tweet_lines = [line for line, emotion in TweetDataSet(test_mode=False).get_training_set()]
+movie_lines = [line for line, sentiment in MovieReviewDataSet(test_mode=False).get_training_set()]
+
+
+def measure(name, toolkit, documents):
+    """
+    Prints the documents per second for each of the worker counts
+    :param name: the name of the benchmark
+    :param toolkit: the toolkit
+    :param documents: the list of documents
+    :return: None
+    """
+    print(name + " : " + str(len(documents)) + " documents, " + str(multiprocessing.cpu_count()) + " cpus")
+    expected = None
+    for workers in WORKERS:
+        start = time.time()
+        results = toolkit.analyse_parallel(documents, workers, CHUNK_SIZE)
+        elapsed = time.time() - start
+
+        expected = expected or results
+        print("    workers " + str(workers) + " : " + str(int(len(documents) / elapsed)) + " documents per second" +
+              ("" if results == expected else " (DIFFERENT RESULTS)"))
+
+
+# #####################EMOTION ANALYSIS SCALING#########################
+
+measure("EmotionScoreMultinomialNB on tweets", Toolkit(sentence_level=0), tweet_lines * 4)
+measure("UnigramEmotionMultinomialNB on tweets", Toolkit(sentence_level=2), tweet_lines * 4)
+
+########################################################################
+
+# ####################SENTIMENT ANALYSIS SCALING########################
+
+measure("OpinionLexiconSentimentCount on movie reviews", Toolkit(sentiment=True, sentence_level=4), movie_lines * 4)
+measure("UnigramSentimentMaxEnt on movie reviews", Toolkit(sentiment=True, sentence_level=2), movie_lines)
+
+#######################################################################
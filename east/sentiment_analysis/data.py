@@ -1,7 +1,13 @@
 from collections import defaultdict
+import logging
 import re
 
+import numpy
+
 from east.utilities.storage import Storage
+from east.utilities.cache import ResourceCache
+from east.utilities.compact import CompactTable
+from east.utilities.text import Text
 from east.common.base_classes import DataSet
 
 __author__ = 'bijoy'
@@ -20,20 +26,22 @@ class MovieReviewDataSet(DataSet):
 
     def read(self):
         mapping = defaultdict(list)
-
-        data_set_file = open(self.get_absolute_path(self.POSITIVE_DATA_SET), "r")
-        for line in data_set_file:
-            mapping["positive"].append(line)
-        data_set_file.close()
-
-        data_set_file = open(self.get_absolute_path(self.NEGATIVE_DATA_SET), "r")
-        for line in data_set_file:
-            mapping["negative"].append(line)
-        data_set_file.close()
+        for line, sentiment in self.stream():
+            mapping[sentiment].append(line)
 
         Storage.dump(self.get_absolute_path(self.FILENAME), mapping)
         return mapping
 
+    @classmethod
+    def stream(cls):
+        for sentiment, data_set in (("positive", cls.POSITIVE_DATA_SET), ("negative", cls.NEGATIVE_DATA_SET)):
+            data_set_file = open(cls.get_absolute_path(data_set), "r")
+            try:
+                for line in data_set_file:
+                    yield line, sentiment
+            finally:
+                data_set_file.close()
+
 
 class OpinionLexicon(DataSet):
     """
@@ -46,6 +54,22 @@ class OpinionLexicon(DataSet):
     FILENAME = DataSet.FOLDER + "opinion_lexicon_data_set.pickled"
     POSITIVE_DATA_SET = "datasets/opinion_lexicon/positive-words.txt"
     NEGATIVE_DATA_SET = "datasets/opinion_lexicon/negative-words.txt"
+    NEGATIVE_WORDS = frozenset(Text.NEGATIVE_WORDS)
+    COMPILED = ".compiled"
+
+    def load(self):
+        DataSet.load(self)
+        self.positive_words, self.negative_words = ResourceCache.get(
+            self.get_absolute_path(self.FILENAME) + self.COMPILED, self.compile)
+
+    def compile(self):
+        """
+        Compiles the mapping into a set of positive words and a set of negative words
+        :return: a tuple (positive words, negative words)
+        """
+        positive_words = frozenset(word for word, sentiment in self.mapping.items() if sentiment == 'positive')
+        negative_words = frozenset(word for word, sentiment in self.mapping.items() if sentiment == 'negative')
+        return positive_words, negative_words
 
     def read(self):
         mapping = dict()
@@ -82,19 +106,78 @@ class OpinionLexicon(DataSet):
         else:
             negated_words = [(word.lower(), False) for word in words]
         for word, negated in negated_words:
-            if word in self.mapping.keys():
-                sentiment = self.mapping[word]
-                if sentiment == 'positive' or (sentiment == 'negative' and negated):
-                    sentiment_counts[1] += 1
-                elif sentiment == 'negative' or (sentiment == 'positive' and negated):
-                    sentiment_counts[0] += 1
+            sentiment = self.mapping.get(word)
+            if sentiment == 'positive' or (sentiment == 'negative' and negated):
+                sentiment_counts[1] += 1
+            elif sentiment == 'negative' or (sentiment == 'positive' and negated):
+                sentiment_counts[0] += 1
+        return sentiment_counts
+
+    def scan_opinion_count(self, text):
+        """
+        Returns the same counts as get_opinion_count over the words of the text (tokenized like the TweetTokenizer,
+        so the urls, user names and hashtags are single words), in a single pass over the text
+        without building the list of words
+        :param text: the raw text
+        :return: a list [a, b] with a : number of negative words, b : number of positive words
+        """
+        sentiment_counts = [0, 0]
+        negate = False
+        for word in Text.fast_tokenizer.scan(Text.unicode_to_ascii(text.lower())):
+            if self.allow_negation:
+                if word in self.NEGATIVE_WORDS:
+                    negate = not negate
+                elif not Text.ALPHANUMERIC_RE.search(word):
+                    negate = False
+
+            if word in self.positive_words:
+                sentiment_counts[1] += 1
+            elif word in self.negative_words:
+                sentiment_counts[1 if negate else 0] += 1
         return sentiment_counts
 
 
 class SentiWordNet(DataSet):
+    """
+    The data from the SentiWordNet 3.0 lexicon.
+    It is compiled into a memory mapped table of (negative score, positive score) rows,
+    which is shared by all the processes using it.
+    """
     FILENAME = DataSet.FOLDER + "senti_word_net_data_set.pickled"
+    COMPACT_FILENAME = DataSet.FOLDER + "senti_word_net_data_set.compact"
     DATA_SET = "datasets/sentiwordnet/SentiWordNet_3.0.0.txt"
 
+    def load(self):
+        """
+        Memory maps the compiled lexicon, compiling it from the data set the first time
+        (the table is shared with all the instances)
+        :return: None
+        """
+        self.table = ResourceCache.get(self.get_absolute_path(self.COMPACT_FILENAME), self.load_table)
+
+    def load_table(self):
+        """
+        Memory maps the compiled lexicon, compiling it if it is not stored yet
+        :return: the table
+        """
+        table = CompactTable.load(self.get_absolute_path(self.COMPACT_FILENAME))
+        if table is None:
+            table = self.compile()
+        return table
+
+    def compile(self):
+        """
+        Compiles the data set into the table and stores it for the next loads
+        (the dict is not kept, so it is not put in the shared cache either)
+        :return: the table
+        """
+        table = CompactTable.create(self.read_mapping(), numpy.float32)
+        try:
+            table.dump(self.get_absolute_path(self.COMPACT_FILENAME))
+        except (IOError, OSError):
+            logging.warning("could not store the compiled SentiWordNet, it will be compiled on every load")
+        return table
+
     def read(self):
         mapping = dict()
 
@@ -130,11 +213,12 @@ class SentiWordNet(DataSet):
         else:
             negated_words = [(word.lower(), False) for word in words]
 
-        for word, negated in negated_words:
-            sign = -1 if negated else 1
-            if word in self.mapping.keys():
-                sentiments = self.mapping[word]
-                sentiment_scores[0] += sign * sentiments[0]
-                sentiment_scores[1] += sign * sentiments[1]
+        positions = self.table.lookup([word for word, negated in negated_words])
+        signs = numpy.array([-1 if negated else 1 for word, negated in negated_words], dtype=numpy.float32)
+
+        found = positions >= 0
+        if found.any():
+            scores = (self.table.values[positions[found]] * signs[found, numpy.newaxis]).sum(axis=0)
+            sentiment_scores = [float(scores[0]), float(scores[1])]
 
         return sentiment_scores
@@ -1,13 +1,11 @@
 from collections import defaultdict
 
-from progressbar import ProgressBar
 from .data import SentiWordNet, OpinionLexicon
-from east.common.base_classes import SentenceLevel
+from east.common.base_classes import SentenceLevel, WordClassifier
 from sklearn.svm import SVC
 from sklearn.naive_bayes import GaussianNB, BernoulliNB, MultinomialNB
 from sklearn.linear_model import LogisticRegression
 from .sentiments import Sentiments
-from east.utilities.storage import Storage
 
 __author__ = 'bijoy'
 
@@ -19,6 +17,12 @@ class MaxSentimentScore(SentenceLevel):
         SentenceLevel.__init__(self)
         self.word_sentiment_scores = SentiWordNet(allow_negation=allow_negation)
 
+    def normalize_sentence(self, sentence):
+        return sentence.lower()
+
+    def get_model_fingerprint(self):
+        return self.create_fingerprint(self.word_sentiment_scores.allow_negation)
+
     def get_prediction(self, sentence):
         # Split into words
         words = self.text_utility.tokenize(sentence.lower())
@@ -38,10 +42,11 @@ class OpinionLexiconSentimentCount(SentenceLevel):
         SentenceLevel.__init__(self)
         self.opinion_lexicon = OpinionLexicon(allow_negation=allow_negation)
 
+    def get_model_fingerprint(self):
+        return self.create_fingerprint(self.opinion_lexicon.allow_negation)
+
     def get_prediction(self, sentence):
-        # Split into words
-        words = self.text_utility.tokenize(sentence.lower())
-        sentiment_counts = self.opinion_lexicon.get_opinion_count(words)
+        sentiment_counts = self.opinion_lexicon.scan_opinion_count(sentence)
 
         if sentiment_counts[1] >= sentiment_counts[0]:
             return 'positive'
@@ -49,41 +54,27 @@ class OpinionLexiconSentimentCount(SentenceLevel):
         return 'negative'
 
 
-class WordSentimentClassifier(SentenceLevel):
+class WordSentimentClassifier(WordClassifier):
     """
     Classify using the feature set of unigrams in the document
     """
     FOLDER = 'pickled/sentiment/'
     FILENAME = 'classifier_word_model'
-    WORD_LIMIT = 20000
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        SentenceLevel.__init__(self, filename)
-        self.allow_negation = allow_negation
-        self.engine = None
-        self.trained = False
-        self.word_set = dict()
+    def get_normalization_key(self):
+        return 'unigrams', self.allow_negation, self.text_utility.get_tokenizer_type()
 
-    def create_word_vector(self, words):
-        count_list = [0 for i in range(len(self.word_set))]
-        for word in words:
-            if word in self.word_set.keys():
-                count_list[self.word_set[word]] = 1
-        return count_list
-
-    def get_normalized_words(self, line):
-        words = self.text_utility.tokenize(line)
-        if self.allow_negation:
-            words = self.text_utility.negate_words(words)
-        words = self.text_utility.remove_punctuations(words)
-        words = self.text_utility.lemmatize(words)
-        return words
-
-    def train_words(self, training_set):
-        bar = ProgressBar()
+    def normalize_words(self, line):
+        return self.text_utility.normalize(line, negate=self.allow_negation)
+
+    def get_word_set(self, lines):
+        """
+        Builds the word set from the words of the lines
+        :param lines: an iterable of lines
+        :return: the dict object mapping a word to its column
+        """
         word_count = defaultdict(lambda: 0)
-        for tagged_line in bar(training_set):
-            line = tagged_line[0]
+        for line in lines:
             words = self.get_normalized_words(line.lower())
             for word in words:
                 word_count[word] += 1
@@ -91,45 +82,19 @@ class WordSentimentClassifier(SentenceLevel):
         keys = sorted(word_count.items(),
                       key=word_count.get,
                       reverse=True)[:min(self.WORD_LIMIT, len(word_count))]
-        self.word_set.clear()
+        word_set = dict()
         for word, frequency in keys:
-            self.word_set[word] = len(self.word_set)
-
-    def train(self, training_set, save_file=True):
-        classifier_x = []
-        classifier_y = []
+            word_set[word] = len(word_set)
+        return word_set
 
-        self.train_words(training_set)
+    def get_classes(self):
+        return Sentiments.SENTIMENTS
 
-        bar = ProgressBar()
-        for tagged_line in bar(training_set):
-            line = tagged_line[0]
-            sentiment = tagged_line[1]
-            words = self.get_normalized_words(line)
-            x = self.create_word_vector(words)
+    def get_class_id(self, class_name):
+        return Sentiments.get_sentiment_id(class_name)
 
-            classifier_x.append(x)
-            classifier_y.append(Sentiments.get_sentiment_id(sentiment))
-
-        self.engine.fit(classifier_x, classifier_y)
-        self.trained = True
-
-        if save_file:
-            Storage.dump(self.filename, (self.engine, self.word_set))
-
-    def get_prediction(self, sentence):
-        # Split into words
-        if not self.trained:
-            engine = Storage.load(self.filename)
-            if engine:
-                self.engine = engine[0]
-                self.word_set = engine[1]
-                self.trained = True
-
-        words = self.get_normalized_words(sentence.lower())
-        sentiment_id = self.engine.predict([self.create_word_vector(words)])[0]
-
-        return Sentiments.get_sentiment_for_id(sentiment_id)
+    def get_class_for_id(self, class_id):
+        return Sentiments.get_sentiment_for_id(class_id)
 
 
 class UnigramSentimentSVM(WordSentimentClassifier):
@@ -138,9 +103,9 @@ class UnigramSentimentSVM(WordSentimentClassifier):
     FILENAME = 'svm_word_model'
     WORD_LIMIT = 12000
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        WordSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = SVC()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        WordSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = SVC()
 
 
 class UnigramSentimentGaussianNB(WordSentimentClassifier):
@@ -148,9 +113,9 @@ class UnigramSentimentGaussianNB(WordSentimentClassifier):
 
     FILENAME = 'gaussian_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        WordSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = GaussianNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        WordSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = GaussianNB()
 
 
 class UnigramSentimentBernoulliNB(WordSentimentClassifier):
@@ -158,9 +123,9 @@ class UnigramSentimentBernoulliNB(WordSentimentClassifier):
 
     FILENAME = 'bernoulli_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        WordSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = BernoulliNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        WordSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = BernoulliNB()
 
 
 class UnigramSentimentMultinomialNB(WordSentimentClassifier):
@@ -168,9 +133,9 @@ class UnigramSentimentMultinomialNB(WordSentimentClassifier):
 
     FILENAME = 'multinomial_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        WordSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = MultinomialNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        WordSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = MultinomialNB()
 
 
 class UnigramSentimentMaxEnt(WordSentimentClassifier):
@@ -178,9 +143,9 @@ class UnigramSentimentMaxEnt(WordSentimentClassifier):
 
     FILENAME = 'max_ent_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        WordSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = LogisticRegression()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        WordSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = LogisticRegression()
 
 
 class BigramSentimentClassifier(WordSentimentClassifier):
@@ -191,11 +156,11 @@ class BigramSentimentClassifier(WordSentimentClassifier):
     FOLDER = 'pickled/sentiment/'
     FILENAME = 'bigram_word_model'
 
-    def get_normalized_words(self, line):
-        words = self.text_utility.tokenize(line)
-        if self.allow_negation:
-            words = self.text_utility.negate_words(words)
-        words = self.text_utility.remove_punctuations(words)
+    def get_normalization_key(self):
+        return 'bigrams', self.allow_negation, self.text_utility.get_tokenizer_type()
+
+    def normalize_words(self, line):
+        words = self.text_utility.normalize(line, negate=self.allow_negation, lemmatize=False)
 
         bigrams = list()
         previous_word = '$'
@@ -212,9 +177,9 @@ class BigramSentimentMultinomialNB(BigramSentimentClassifier):
 
     FILENAME = 'bigram_multinomial_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        BigramSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = MultinomialNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        BigramSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = MultinomialNB()
 
 
 class BigramSentimentGaussianNB(BigramSentimentClassifier):
@@ -222,9 +187,9 @@ class BigramSentimentGaussianNB(BigramSentimentClassifier):
 
     FILENAME = 'bigram_gaussian_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        BigramSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = GaussianNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        BigramSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = GaussianNB()
 
 
 class BigramSentimentBernoulliNB(BigramSentimentClassifier):
@@ -232,9 +197,9 @@ class BigramSentimentBernoulliNB(BigramSentimentClassifier):
 
     FILENAME = 'bigram_bernoulli_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        BigramSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = BernoulliNB()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        BigramSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = BernoulliNB()
 
 
 class BigramSentimentMaxEnt(BigramSentimentClassifier):
@@ -242,9 +207,9 @@ class BigramSentimentMaxEnt(BigramSentimentClassifier):
 
     FILENAME = 'bigram_bernoulli_nb_word_model'
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        BigramSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = LogisticRegression()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        BigramSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = LogisticRegression()
 
 
 class BigramSentimentSVM(BigramSentimentClassifier):
@@ -253,6 +218,6 @@ class BigramSentimentSVM(BigramSentimentClassifier):
     FILENAME = 'bigram_bernoulli_nb_word_model'
     WORD_LIMIT = 12000
 
-    def __init__(self, allow_negation=True, filename=FILENAME):
-        BigramSentimentClassifier.__init__(self, allow_negation, filename)
-        self.engine = SVC()
+    def __init__(self, allow_negation=True, filename=FILENAME, hash_buckets=None):
+        BigramSentimentClassifier.__init__(self, allow_negation, filename, hash_buckets)
+        self.engine_template = SVC()
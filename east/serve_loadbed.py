@@ -0,0 +1,107 @@
+import argparse
+import json
+import threading
+import time
+import urllib2
+
+from east.emotion_analysis.data import TweetDataSet
+
+__author__ = 'bijoy'
+
+# Fires the tweets of the bundled data set at a running `east serve` from concurrent clients,
+# and prints the throughput, the latency percentiles and the number of rejected (503) requests
+#
+#   $ east serve &
+#   $ python -m east.serve_loadbed --clients 32 --requests 5000
+
+
+def get_percentile(values, percentile):
+    """
+    :param values: the sorted list of values
+    :param percentile: the percentile (0 - 100)
+    :return: the value at the percentile
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * percentile / 100.0))]
+
+
+def client(url, documents, body_for, latencies, statuses, lock):
+    """
+    Sends the documents one request at a time
+    :param url: the url of the endpoint
+    :param documents: the list of documents (or of lists of documents for /analyse_batch)
+    :param body_for: the function creating the request body for a document
+    :param latencies: the list the latencies of the successful requests are added to
+    :param statuses: the dict counting the responses by status
+    :param lock: the lock of latencies and statuses
+    :return: None
+    """
+    for document in documents:
+        start = time.time()
+        try:
+            request = urllib2.Request(url, json.dumps(body_for(document)), {'Content-Type': 'application/json'})
+            response = urllib2.urlopen(request)
+            response.read()
+            status = response.getcode()
+        except urllib2.HTTPError as error:
+            status = error.code
+        except urllib2.URLError:
+            status = 'connection error'
+        elapsed = time.time() - start
+
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8000', type=str, help='the url of the server')
+    parser.add_argument('--clients', default=16, type=int, help='the number of concurrent clients')
+    parser.add_argument('--requests', default=2000, type=int, help='the total number of requests')
+    parser.add_argument('--batch', default=0, type=int, help='send /analyse_batch requests of this many documents')
+    parser.add_argument('-a', '--algorithm', default=None, type=str, help='the sentence level algorithm')
+    parser.add_argument('-m', '--sentiment', action='store_true', help='use the default sentiment algorithm')
+    arguments = parser.parse_args()
+
+    tweets = [line for line, emotion in TweetDataSet(test_mode=False).get_training_set()]
+    options = {"algorithm": arguments.algorithm, "sentiment": arguments.sentiment}
+    if arguments.batch:
+        url = arguments.url + '/analyse_batch'
+        documents = [[tweets[(i * arguments.batch + j) % len(tweets)] for j in range(arguments.batch)]
+                     for i in range(arguments.requests)]
+        body_for = lambda texts: dict(options, texts=texts)
+    else:
+        url = arguments.url + '/analyse'
+        documents = [tweets[i % len(tweets)] for i in range(arguments.requests)]
+        body_for = lambda text: dict(options, text=text)
+
+    latencies = []
+    statuses = dict()
+    lock = threading.Lock()
+    threads = [threading.Thread(target=client, args=(url, documents[i::arguments.clients], body_for,
+                                                     latencies, statuses, lock))
+               for i in range(arguments.clients)]
+
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+
+    latencies.sort()
+    documents_per_request = arguments.batch or 1
+    print("requests : " + str(arguments.requests) + " in " + str(round(elapsed, 2)) + " s, " +
+          str(int(len(latencies) / elapsed)) + " requests per second, " +
+          str(int(len(latencies) * documents_per_request / elapsed)) + " documents per second")
+    print("latency (ms) : p50 " + str(round(get_percentile(latencies, 50) * 1000, 1)) +
+          ", p95 " + str(round(get_percentile(latencies, 95) * 1000, 1)) +
+          ", p99 " + str(round(get_percentile(latencies, 99) * 1000, 1)))
+    print("responses : " + ", ".join(str(status) + " x " + str(count) for status, count in sorted(statuses.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+import argparse
+import json
+import logging
+import timeit
+
+from east.common.batching import BatchingPredictor, Overloaded, Timeout
+from east.common.caching import PredictionCache
+from east.toolkit import Toolkit, WARM_UP_DOCUMENT
+from east.utilities.metrics import Metrics
+from east.utilities.text import Text
+
+__author__ = 'bijoy'
+
+
+class AnalysisService:
+    """
+    The sentence and document level algorithms served, by their names
+    """
+
+    def __init__(self, algorithm_names, max_batch_size=256, max_wait=0.005, max_queue_size=1000, timeout=30.0,
+                 cache_size=0):
+        """
+        Creates (and loads) the sentence level algorithms and starts their batching predictors
+        :param algorithm_names: the names of the sentence level algorithms to serve
+        :param max_batch_size: the maximum number of sentences predicted together
+        :param max_wait: the maximum time in seconds a request waits for other requests to join its batch
+        :param max_queue_size: the maximum number of requests waiting for an algorithm
+        :param timeout: the maximum time in seconds a request waits for its predictions
+        :param cache_size: cache the predictions of this many distinct sentences per algorithm, 0 for none
+        """
+        self.timeout = timeout
+        self.text_utility = Text()
+        self.sentiment = dict()
+        self.predictors = dict()
+        self.document_algorithms = dict()
+
+        sentence_algorithms = [(algorithm, True) for algorithm in Toolkit.sl_sentiment] + \
+                              [(algorithm, False) for algorithm in Toolkit.sl_emotion]
+        for name in algorithm_names:
+            matches = [(algorithm, sentiment) for algorithm, sentiment in sentence_algorithms
+                       if algorithm.__name__ == name]
+            if not matches:
+                raise ValueError("unknown sentence level algorithm " + name)
+
+            algorithm, sentiment = matches[0]
+            instance = algorithm()
+            # analysing a sentence loads the model and the lexicons now, instead of on the first request
+            instance.predict_many([WARM_UP_DOCUMENT])
+            if cache_size:
+                instance = PredictionCache(instance, cache_size)
+            self.sentiment[name] = sentiment
+            self.predictors[name] = BatchingPredictor(instance, max_batch_size, max_wait, max_queue_size)
+
+        for algorithm in Toolkit.dl_sentiment + Toolkit.dl_emotion:
+            self.document_algorithms[algorithm.__name__] = algorithm()
+
+        # loads punkt now, instead of on the first request
+        self.text_utility.split_document(WARM_UP_DOCUMENT)
+
+        # the first sentence level algorithm of each kind is the default
+        self.default_algorithms = dict()
+        for name in algorithm_names:
+            self.default_algorithms.setdefault(self.sentiment[name], name)
+
+    @staticmethod
+    def get_default_document_algorithm(sentiment):
+        """
+        :param sentiment: is sentiment analysis
+        :return: the name of the default document level algorithm
+        """
+        return (Toolkit.dl_sentiment if sentiment else Toolkit.dl_emotion)[0].__name__
+
+    def analyse(self, documents, algorithm=None, document_algorithm=None, club=False, sentiment=None):
+        """
+        Analyses the documents
+        :param documents: the list of documents
+        :param algorithm: the name of the sentence level algorithm
+        :param document_algorithm: the name of the document level algorithm
+        :param club: treat a document as a single sentence
+        :param sentiment: pick the default algorithm for sentiment (True) or emotion (False) analysis
+        :return: a list of dict objects, same as Toolkit.analyse_many
+        """
+        if algorithm is None:
+            algorithm = self.default_algorithms.get(bool(sentiment))
+        if algorithm not in self.predictors:
+            raise ValueError("algorithm not served: " + str(algorithm) +
+                             ", served: " + ", ".join(sorted(self.predictors.keys())))
+
+        if document_algorithm is None:
+            document_algorithm = self.get_default_document_algorithm(self.sentiment[algorithm])
+        if document_algorithm not in self.document_algorithms:
+            raise ValueError("unknown document level algorithm: " + str(document_algorithm))
+
+        metrics = Metrics.active
+        start_time = metrics and timeit.default_timer()
+
+        sentences = list()
+        sentence_counts = list()
+        with Metrics.stage(Metrics.SPLIT_DOCUMENT):
+            for document in documents:
+                if not isinstance(document, basestring):
+                    raise ValueError("the documents must be strings")
+                if isinstance(document, unicode):
+                    document = document.encode('utf-8')
+                document_sentences = [document] if club else self.text_utility.split_document(document)
+                sentences += document_sentences
+                sentence_counts.append(len(document_sentences))
+
+        # the sentence level stages are timed by the batching thread, along with the other requests of the batch
+        all_tags = self.predictors[algorithm].submit(sentences).result(self.timeout)
+
+        results = list()
+        start = 0
+        with Metrics.stage(Metrics.DOCUMENT_LEVEL):
+            for sentence_count in sentence_counts:
+                tags = all_tags[start:start + sentence_count]
+                start += sentence_count
+                tag = self.document_algorithms[document_algorithm].get_prediction(tags=tags)
+                results.append({"tag": tag, "tags": tags})
+
+        if metrics:
+            Toolkit.add_metrics(metrics, documents, sentence_counts, timeit.default_timer() - start_time)
+        return results
+
+    def get_health(self):
+        """
+        :return: the status of the service, with the queue size of each algorithm
+        """
+        return {"status": "ok",
+                "algorithms": dict((name, {"sentiment": self.sentiment[name],
+                                           "queue": predictor.queue.qsize()})
+                                   for name, predictor in self.predictors.items())}
+
+    def get_stats(self):
+        """
+        :return: the batch size and queue wait histograms of each algorithm, with the stats of its prediction cache
+        """
+        stats = dict()
+        for name, predictor in self.predictors.items():
+            stats[name] = predictor.get_stats()
+            if isinstance(predictor.algorithm, PredictionCache):
+                stats[name]["cache"] = predictor.algorithm.get_stats()
+        return stats
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /health
+    GET /stats (the batch size and queue wait histograms, and the prediction cache stats)
+    GET /metrics (the stage timings in the prometheus text format, with --metrics)
+    POST /analyse {"text": "...", "algorithm": "...", "document_algorithm": "...", "club": false, "sentiment": false}
+    POST /analyse_batch {"texts": ["...", ...], (same options)}
+    """
+    MAX_BODY_SIZE = 10 * 1024 * 1024
+    protocol_version = 'HTTP/1.1'
+
+    def send_json(self, status, body):
+        content = json.dumps(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, self.server.service.get_health())
+        elif self.path == '/stats':
+            self.send_json(200, self.server.service.get_stats())
+        elif self.path == '/metrics' and Metrics.active is not None:
+            content = Metrics.active.to_prometheus()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path not in ('/analyse', '/analyse_batch'):
+            self.send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.getheader('Content-Length') or 0)
+        if length > self.MAX_BODY_SIZE:
+            self.send_json(413, {"error": "request too large"})
+            self.close_connection = 1
+            return
+
+        try:
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError("the request must be a JSON object")
+            documents = [request["text"]] if self.path == '/analyse' else request["texts"]
+            if not isinstance(documents, list):
+                raise ValueError("texts must be a list")
+            results = self.server.service.analyse(documents, request.get("algorithm"),
+                                                  request.get("document_algorithm"),
+                                                  bool(request.get("club")), request.get("sentiment"))
+        except Overloaded:
+            self.send_json(503, {"error": "overloaded, retry later"})
+            return
+        except Timeout:
+            self.send_json(504, {"error": "prediction timed out"})
+            return
+        except (ValueError, KeyError) as error:
+            self.send_json(400, {"error": error.__class__.__name__ + ": " + str(error)})
+            return
+        except Exception as error:
+            logging.exception("analysis failed")
+            self.send_json(500, {"error": error.__class__.__name__ + ": " + str(error)})
+            return
+
+        self.send_json(200, results[0] if self.path == '/analyse' else {"results": results})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    """A thread per connection, the predictions themselves are made by the batching predictor threads"""
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address, service, verbose=False):
+        HTTPServer.__init__(self, address, RequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='east serve', description='HTTP inference server')
+    parser.add_argument('--host', default='127.0.0.1', type=str, help='the address to listen on')
+    parser.add_argument('--port', default=8000, type=int, help='the port to listen on')
+    parser.add_argument('-a', '--algorithm', action='append', dest='algorithms', default=None,
+                        help='a sentence level algorithm to serve, by name (repeatable, the first of each kind '
+                             'is the default), default: ' + Toolkit.sl_emotion[0].__name__ + ' and ' +
+                             Toolkit.sl_sentiment[0].__name__ + ' ; ' + Toolkit.get_help(True, True) + ' ; ' +
+                             Toolkit.get_help(False, True))
+    parser.add_argument('--max-batch-size', default=256, type=int, help='the maximum sentences predicted together')
+    parser.add_argument('--max-wait', default=5.0, type=float,
+                        help='milliseconds a request waits for other requests to join its batch')
+    parser.add_argument('--max-queue', default=1000, type=int,
+                        help='the maximum requests waiting per algorithm, more are answered with 503')
+    parser.add_argument('--timeout', default=30.0, type=float, help='seconds a request waits for its predictions')
+    parser.add_argument('--cache-size', default=0, type=int,
+                        help='cache the predictions of this many distinct sentences per algorithm')
+    parser.add_argument('--metrics', action='store_true',
+                        help='time the stages of the analysis, served on /metrics in the prometheus text format')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log every request')
+    arguments = parser.parse_args(args)
+
+    if arguments.metrics:
+        Metrics.enable()
+
+    algorithms = arguments.algorithms or [Toolkit.sl_emotion[0].__name__, Toolkit.sl_sentiment[0].__name__]
+    logging.getLogger().setLevel(logging.INFO)
+    logging.info("loading " + ", ".join(algorithms))
+    try:
+        service = AnalysisService(algorithms, arguments.max_batch_size, arguments.max_wait / 1000.0,
+                                  arguments.max_queue, arguments.timeout, arguments.cache_size)
+    except ValueError as error:
+        parser.error(str(error))
+
+    server = Server((arguments.host, arguments.port), service, arguments.verbose)
+    logging.info("serving on http://" + arguments.host + ":" + str(server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from east.common.caching import PersistentPredictionCache, get_text_key
+from east.emotion_analysis.data import TweetDataSet
+from east.emotion_analysis.sentence_level import UnigramEmotionMultinomialNB
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.sentiment_analysis.sentence_level import UnigramSentimentMultinomialNB
+from east.toolkit import Toolkit
+from east.utilities.prediction_store import PredictionStore
+
+__author__ = 'bijoy'
+
+# Analyses the tweets twice with a cache file (like two nightly backfills), compares the results and the times
+# with the analysis without the cache, while another process reads the file, then checks the sentence level
+# cache and that a model trained and not saved is not cached
+
+DOCUMENTS = 5000
+BATCH_SIZE = 100
+
+# the sentences ending with a backslash can not be decoded by Text.unicode_to_ascii
+documents = [line for line, emotion in TweetDataSet.stream() if '\\' not in line][:DOCUMENTS]
+sentences = [line for line, sentiment in MovieReviewDataSet.stream()][:DOCUMENTS]
+cache_file = os.path.join(tempfile.mkdtemp(), 'predictions.sqlite')
+
+
+def analyse(toolkit):
+    """
+    :param toolkit: the toolkit
+    :return: the list of results of the documents, and the elapsed time
+    """
+    start = time.time()
+    results = list()
+    for batch_start in range(0, len(documents), BATCH_SIZE):
+        results += toolkit.analyse_many(documents[batch_start:batch_start + BATCH_SIZE])
+    return results, time.time() - start
+
+
+def read_continuously(path, keys, stop):
+    """
+    Reads the cache file until stop is set, as a reader process sharing the file with the writer
+    :param path: the path of the cache file
+    :param keys: the keys looked up
+    :param stop: the multiprocessing Event
+    :return: None
+    """
+    store = PredictionStore(path)
+    reads = 0
+    while not stop.is_set():
+        store.get_many('any model', keys)
+        reads += 1
+    print("reader process : " + str(reads) + " reads of " + str(len(keys)) + " keys without errors")
+
+
+toolkit = Toolkit()
+toolkit.analyse(documents[0])
+expected, plain_time = analyse(toolkit)
+
+stop = multiprocessing.Event()
+reader = multiprocessing.Process(target=read_continuously,
+                                 args=(cache_file, [get_text_key(document) for document in documents[:1000]], stop))
+reader.start()
+cold, cold_time = analyse(Toolkit(cache_file=cache_file))
+stop.set()
+reader.join()
+
+warm, warm_time = analyse(Toolkit(cache_file=cache_file))
+print("without the cache file : " + str(round(plain_time, 2)) + " s")
+print("first run with the cache file : " + str(round(cold_time, 2)) + " s" +
+      ("" if cold == expected else " (DIFFERENT RESULTS)"))
+print("second run with the cache file : " + str(round(warm_time, 2)) + " s" +
+      ("" if warm == expected else " (DIFFERENT RESULTS)"))
+
+algorithm = UnigramSentimentMultinomialNB()
+expected = algorithm.predict_many(sentences)
+for run in range(2):
+    start = time.time()
+    predictions = PersistentPredictionCache(UnigramSentimentMultinomialNB(), cache_file).predict_many(sentences)
+    print("sentence level, run " + str(run + 1) + " : " + str(round(time.time() - start, 2)) + " s" +
+          ("" if predictions == expected else " (DIFFERENT PREDICTIONS)"))
+
+# a model trained and not saved has no fingerprint, its predictions are not stored
+algorithm = UnigramEmotionMultinomialNB()
+algorithm.train(list(TweetDataSet.stream())[:5000], False)
+store = PredictionStore(cache_file)
+PersistentPredictionCache(algorithm, store).predict_many(documents[:100])
+print("model trained and not saved : fingerprint " + str(algorithm.get_model_fingerprint()) + ", " +
+      str(store.get_stats()["writes"]) + " predictions stored")
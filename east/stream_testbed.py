@@ -0,0 +1,63 @@
+import resource
+import time
+
+from east.emotion_analysis.data import TweetDataSet
+from east.emotion_analysis.sentence_level import UnigramEmotionMultinomialNB
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.sentiment_analysis.sentence_level import UnigramSentimentMultinomialNB, UnigramSentimentBernoulliNB
+
+__author__ = 'bijoy'
+
+# Trains some algorithms over the streamed data sets, compares their predictions with the algorithms trained
+# in memory, then trains over a long stream (the data set repeated) to check that the memory stays bounded
+
+REPEAT = 50
+CHUNK_SIZE = 10000
+HASH_BUCKETS = 2 ** 18
+
+
+def get_peak_memory():
+    """
+    :return: the peak memory of the process in MB
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def compare(data_set_class, algorithm_class, hash_buckets=None):
+    """
+    Prints whether the algorithm trained over the stream predicts the same as the one trained in memory
+    :param data_set_class: the class of the data set
+    :param algorithm_class: the class of the algorithm
+    :param hash_buckets: hash the words into this many features (needed by the emotion algorithms,
+     their word set is a random sample of the words)
+    :return: None
+    """
+    tagged_lines = list(data_set_class.stream())
+    in_memory = algorithm_class(hash_buckets=hash_buckets)
+    in_memory.train(tagged_lines, False)
+
+    streamed = algorithm_class(hash_buckets=hash_buckets)
+    streamed.train_stream(data_set_class.stream, 1000, False)
+
+    lines = [line for line, tag in tagged_lines]
+    matches = sum(1 for a, b in zip(in_memory.predict_many(lines), streamed.predict_many(lines)) if a == b)
+    print(algorithm_class.__name__ + " (hash_buckets " + str(hash_buckets) + ") : " +
+          str(matches) + " / " + str(len(lines)) + " same predictions")
+
+
+def repeated_stream():
+    for i in range(REPEAT):
+        for tagged_line in TweetDataSet.stream():
+            yield tagged_line
+
+
+compare(TweetDataSet, UnigramEmotionMultinomialNB, HASH_BUCKETS)
+compare(MovieReviewDataSet, UnigramSentimentMultinomialNB, HASH_BUCKETS)
+compare(MovieReviewDataSet, UnigramSentimentBernoulliNB)
+
+memory = get_peak_memory()
+start = time.time()
+UnigramEmotionMultinomialNB(hash_buckets=HASH_BUCKETS).train_stream(repeated_stream, CHUNK_SIZE, False)
+print("UnigramEmotionMultinomialNB over " + str(REPEAT * 21049) + " streamed tweets : " +
+      str(int(REPEAT * 21049 / (time.time() - start))) + " lines per second, peak memory " +
+      str(round(memory, 1)) + " MB -> " + str(round(get_peak_memory(), 1)) + " MB")
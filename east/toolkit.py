@@ -1,35 +1,65 @@
-from east.emotion_analysis.sentence_level import *
-from east.emotion_analysis.document_level import *
-from east.sentiment_analysis.sentence_level import *
-from east.sentiment_analysis.document_level import *
-
+from east.common.algorithms import lazy_algorithms, SENTIMENT_SENTENCE_LEVEL, SENTIMENT_DOCUMENT_LEVEL, \
+    EMOTION_SENTENCE_LEVEL, EMOTION_DOCUMENT_LEVEL
+from east.common.caching import PredictionCache, PersistentPredictionCache, get_text_key
+from east.utilities.metrics import Metrics
+from east.utilities.prediction_store import PredictionStore
 from east.utilities.text import Text
+from collections import deque, OrderedDict
+import hashlib
+import multiprocessing
+import os
+import timeit
 
 __author__ = 'bijoy'
 
+# the toolkit used by the forked worker processes of analyse_iterable, they inherit it from the parent
+parallel_toolkit = None
+
+# a document analysed before forking, to load the models, lexicons and nltk resources in the parent
+WARM_UP_DOCUMENT = "This is a short document. It loads everything the analysis needs!"
+
+
+def analyse_chunk(documents):
+    """
+    Analyses a chunk of documents in a worker process
+    :param documents: the list of documents
+    :return: the list of results
+    """
+    return parallel_toolkit.analyse_each(documents)
+
 
 class Toolkit:
     """
     API class, acts as a quick interface for integration into other python applications
     """
-    sl_sentiment = [UnigramSentimentMultinomialNB, UnigramSentimentBernoulliNB,
-                    UnigramSentimentMaxEnt, UnigramSentimentGaussianNB,
-                    OpinionLexiconSentimentCount, BigramSentimentMultinomialNB,
-                    BigramSentimentBernoulliNB, BigramSentimentGaussianNB,
-                    UnigramSentimentSVM, MaxSentimentScore]
-    dl_sentiment = [MostFrequentSentiment, LastSentiment, MostContinuousSentiment]
-    sl_emotion = [EmotionScoreMultinomialNB, EmotionScoreSVM, UnigramEmotionMultinomialNB,
-                  UnigramEmotionBernoulliNB, EmotionScoreGaussianNB, UnigramEmotionGaussianNB,
-                  MaxEmotionScore, UnigramEmotionSVM, EmotionScoreBernoulliNB]
-    dl_emotion = [MostFrequentEmotion, LastEmotion, MostContinuousEmotion]
-
-    def __init__(self, sentiment=False, sentence_level=0, document_level=0, club=False):
+    # The algorithms are referenced lazily, a module (and sklearn / nltk with it) is imported
+    # only when one of its algorithms is created. The ids are the positions in these lists.
+    sl_sentiment = lazy_algorithms(SENTIMENT_SENTENCE_LEVEL, [
+        'UnigramSentimentMultinomialNB', 'UnigramSentimentBernoulliNB',
+        'UnigramSentimentMaxEnt', 'UnigramSentimentGaussianNB',
+        'OpinionLexiconSentimentCount', 'BigramSentimentMultinomialNB',
+        'BigramSentimentBernoulliNB', 'BigramSentimentGaussianNB',
+        'UnigramSentimentSVM', 'MaxSentimentScore'])
+    dl_sentiment = lazy_algorithms(SENTIMENT_DOCUMENT_LEVEL, [
+        'MostFrequentSentiment', 'LastSentiment', 'MostContinuousSentiment'])
+    sl_emotion = lazy_algorithms(EMOTION_SENTENCE_LEVEL, [
+        'EmotionScoreMultinomialNB', 'EmotionScoreSVM', 'UnigramEmotionMultinomialNB',
+        'UnigramEmotionBernoulliNB', 'EmotionScoreGaussianNB', 'UnigramEmotionGaussianNB',
+        'MaxEmotionScore', 'UnigramEmotionSVM', 'EmotionScoreBernoulliNB'])
+    dl_emotion = lazy_algorithms(EMOTION_DOCUMENT_LEVEL, [
+        'MostFrequentEmotion', 'LastEmotion', 'MostContinuousEmotion'])
+
+    def __init__(self, sentiment=False, sentence_level=0, document_level=0, club=False, cache_size=0,
+                 cache_file=None):
         """
         Constructor for the API
         :param sentiment: is sentiment analysis
         :param sentence_level: sentence level algorithm id
         :param document_level: document level algorithm id
         :param club: want to club entire document as one sentence
+        :param cache_size: cache the predictions of this many distinct sentences (see PredictionCache), 0 for none
+        :param cache_file: keep the results of the documents and the predictions of the sentences in this SQLite
+         file, for the next runs with the same models (see PredictionStore)
         :return:
         """
         self.sentiment = sentiment
@@ -39,13 +69,20 @@ class Toolkit:
         else:
             self.sentence_level = self.get_sentence_level_emotion_algorithm(sentence_level)
             self.document_level = self.get_document_level_emotion_algorithm(document_level)
+        self.prediction_store = None
+        if cache_file:
+            self.prediction_store = PredictionStore(cache_file)
+            self.sentence_level = PersistentPredictionCache(self.sentence_level, self.prediction_store)
+        if cache_size:
+            self.sentence_level = PredictionCache(self.sentence_level, cache_size)
         self.club = club
+        self.text_utility = Text()
 
     @staticmethod
     def get_algorithm(algorithms, algorithm_id):
         """
         From the list of algorithm classes provided, it tries to return an instance of the algorithm at algorithm_id
-        :param algorithms: the list of algorithm classes
+        :param algorithms: the list of algorithm classes (or lazy algorithms)
         :param algorithm: the position of the algorithm class in the list
         :return: instance of the algorithm or falls back to the first algorithm in the list
         """
@@ -128,13 +165,210 @@ class Toolkit:
         :return: a dict object containing the emotion / sentiment of the document
         as well all the sentences of the document
         """
-        sentences = [document] if self.club else Text().split_document(document)
+        return self.analyse_many([document])[0]
+
+    def analyse_many(self, documents):
+        """
+        Analyses a list of documents together, the sentences of all the documents are predicted in a single batch
+        (with a cache file, only the documents not analysed before with the same models are analysed)
+        :param documents: the list of texts that need to be emotion / sentiment analysed
+        :return: a list of dict objects (same as analyse), in the same order as the documents
+        """
+        fingerprint = self.get_fingerprint() if self.prediction_store is not None else None
+        if fingerprint is None:
+            return self.analyse_documents(documents)
+
+        keys = [get_text_key(document) for document in documents]
+        results = self.prediction_store.get_many(fingerprint, keys)
+
+        missing = OrderedDict()
+        for key, document in zip(keys, documents):
+            if key not in results and key not in missing:
+                missing[key] = document
+
+        if missing:
+            items = list(zip(missing.keys(), self.analyse_documents(list(missing.values()))))
+            self.prediction_store.put_many(fingerprint, items)
+            results.update(items)
 
-        tags = list()
-        for sentence in sentences:
-            tags.append(self.sentence_level.get_prediction(sentence))
-        tag = self.document_level.get_prediction(tags=tags)
-        return {"tag": tag, "tags": tags}
+        # the repeated documents get their own copy of the result
+        return [{"tag": results[key]["tag"], "tags": list(results[key]["tags"])} for key in keys]
+
+    def get_fingerprint(self):
+        """
+        :return: the fingerprint of the analysis of a document, from the fingerprint of the sentence level model,
+         the document level algorithm and the splitting of the documents (None if the model can not be cached)
+        """
+        sentence_fingerprint = self.sentence_level.get_model_fingerprint()
+        if sentence_fingerprint is None:
+            return None
+        # the documents are split by punkt, or by a regex when nltk / punkt is missing (punkt is not loaded to club)
+        if self.club:
+            splitter = 'club'
+        else:
+            splitter = 'punkt' if self.text_utility.get_sentence_detector() else 'regex'
+        key = (sentence_fingerprint, self.document_level.__class__.__name__, splitter)
+        return hashlib.md5(repr(key).encode('utf-8')).hexdigest()
+
+    def analyse_documents(self, documents):
+        """
+        Analyses a list of documents together, without the cache file (see analyse_many)
+        :param documents: the list of texts that need to be emotion / sentiment analysed
+        :return: a list of dict objects (same as analyse), in the same order as the documents
+        """
+        metrics = Metrics.active
+        start_time = metrics and timeit.default_timer()
+
+        sentences = list()
+        sentence_counts = list()
+        with Metrics.stage(Metrics.SPLIT_DOCUMENT):
+            for document in documents:
+                document_sentences = [document] if self.club else self.text_utility.split_document(document)
+                sentences += document_sentences
+                sentence_counts.append(len(document_sentences))
+
+        with Metrics.stage(Metrics.SENTENCE_LEVEL):
+            all_tags = self.sentence_level.predict_many(sentences)
+
+        results = list()
+        start = 0
+        with Metrics.stage(Metrics.DOCUMENT_LEVEL):
+            for sentence_count in sentence_counts:
+                tags = list(all_tags[start:start + sentence_count])
+                start += sentence_count
+                tag = self.document_level.get_prediction(tags=tags)
+                results.append({"tag": tag, "tags": tags})
+
+        if metrics:
+            Toolkit.add_metrics(metrics, documents, sentence_counts, timeit.default_timer() - start_time)
+        return results
+
+    @staticmethod
+    def add_metrics(metrics, documents, sentence_counts, seconds):
+        """
+        Reports the analysis of a batch of documents. The time of a document is only known when it is analysed alone
+        (analyse, or a batch of one document), so only those documents are ranked among the slowest inputs
+        :param metrics: the metrics object
+        :param documents: the list of documents
+        :param sentence_counts: the number of sentences of each document
+        :param seconds: the time spent analysing the documents
+        :return: None
+        """
+        metrics.add_time(Metrics.ANALYSE, seconds)
+        metrics.add_count(Metrics.DOCUMENTS, len(documents))
+        metrics.add_count(Metrics.SENTENCES, sum(sentence_counts))
+        if len(documents) == 1:
+            metrics.add_input(documents[0], seconds)
+
+    def analyse_each(self, documents):
+        """
+        Analyses a list of documents like analyse_many, but a document failing the analysis
+        only gets an error result {"error": ...} instead of failing all the documents
+        :param documents: the list of texts that need to be emotion / sentiment analysed
+        :return: a list of dict objects, in the same order as the documents
+        """
+        try:
+            return self.analyse_many(documents)
+        except Exception:
+            pass
+
+        results = list()
+        for document in documents:
+            try:
+                results.append(self.analyse(document))
+            except Exception as error:
+                results.append({"error": error.__class__.__name__ + ": " + str(error)})
+        return results
+
+    def analyse_parallel(self, documents, workers=None, chunk_size=100):
+        """
+        Analyses a list of documents in parallel worker processes
+        :param documents: the list of texts that need to be emotion / sentiment analysed
+        :param workers: the number of worker processes (all the cpus if None)
+        :param chunk_size: the number of documents sent to a worker at a time
+        :return: a list of dict objects (same as analyse_each), in the same order as the documents
+        """
+        return list(self.analyse_iterable(documents, workers, chunk_size))
+
+    def analyse_iterable(self, documents, workers=None, chunk_size=100):
+        """
+        Analyses the documents in chunks on forked worker processes, yielding the results in the same order.
+        The models and lexicons are loaded once in this process and inherited by the workers.
+        At most two chunks per worker are in flight, so the documents are read lazily and the memory stays flat.
+        (Without fork, or with a single worker, the chunks are analysed in this process)
+        :param documents: an iterable of texts that need to be emotion / sentiment analysed
+        :param workers: the number of worker processes (all the cpus if None)
+        :param chunk_size: the number of documents sent to a worker at a time
+        :return: a generator of dict objects (same as analyse_each)
+        """
+        global parallel_toolkit
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        chunks = self.get_chunks(documents, chunk_size)
+
+        if workers <= 1 or not hasattr(os, 'fork'):
+            for chunk in chunks:
+                for result in self.analyse_each(chunk):
+                    yield result
+            return
+
+        self.warm_up()
+        parallel_toolkit = self
+        pool = multiprocessing.Pool(workers)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(analyse_chunk, (chunk,)))
+                if len(pending) >= 2 * workers:
+                    for result in self.get_async_result(pending.popleft()):
+                        yield result
+            while pending:
+                for result in self.get_async_result(pending.popleft()):
+                    yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+    @staticmethod
+    def get_async_result(async_result):
+        """
+        Waits for the result of a worker
+        :param async_result: the AsyncResult
+        :return: the result
+        """
+        # waiting with a timeout keeps the wait interruptible (Ctrl+C) in python 2
+        return async_result.get(7 * 24 * 60 * 60)
+
+    def warm_up(self):
+        """
+        Loads the model, the lexicons and punkt with a short document, straight through the sentence level algorithm,
+        so that the document is not stored in the cache file nor counted by the prediction cache and the metrics
+        :return: None
+        """
+        algorithm = self.sentence_level
+        while isinstance(algorithm, (PredictionCache, PersistentPredictionCache)):
+            algorithm = algorithm.algorithm
+        algorithm.predict_many([WARM_UP_DOCUMENT])
+        if not self.club:
+            self.text_utility.split_document(WARM_UP_DOCUMENT)
+
+    @staticmethod
+    def get_chunks(documents, chunk_size):
+        """
+        Groups an iterable of documents into lists
+        :param documents: the iterable of documents
+        :param chunk_size: the number of documents in a list
+        :return: a generator of lists of documents
+        """
+        chunk = list()
+        for document in documents:
+            chunk.append(document)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = list()
+        if chunk:
+            yield chunk
 
     @staticmethod
     def get_help_string(list, delimiter=", "):
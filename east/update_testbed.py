@@ -0,0 +1,62 @@
+import os
+import time
+
+from east.sentiment_analysis.data import MovieReviewDataSet
+from east.sentiment_analysis.sentence_level import UnigramSentimentMultinomialNB, UnigramSentimentBernoulliNB
+from east.utilities.cache import ResourceCache
+from east.utilities.storage import Storage
+from east.utilities.update_log import UpdateLog
+
+__author__ = 'bijoy'
+
+# Trains a model on part of the movie reviews into a scratch model file, feeds the rest as updates
+# (like corrections from the reviewers), and checks that a new instance replaying the update log,
+# and the model compacted with its updates, predict the same as the updated instance
+
+FILENAME = 'update_testbed_model'
+UPDATE_SIZES = [1, 10, 100]
+
+movie_data = MovieReviewDataSet(k=5)
+training_set = movie_data.get_training_set(0)
+updates = movie_data.get_testing_set(0)
+lines = [line for line, sentiment in training_set + updates]
+
+
+def measure(algorithm_class):
+    """
+    Prints the time taken by the updates, and whether the reloaded models predict the same
+    :param algorithm_class: the class of the algorithm
+    :return: None
+    """
+    algorithm = algorithm_class(filename=FILENAME)
+    algorithm.train(training_set)
+    filename = algorithm.filename
+    before = algorithm.predict_many(lines)
+
+    start = 0
+    for update_size in UPDATE_SIZES:
+        count = 0
+        started = time.time()
+        while count < 50 and start < len(updates):
+            algorithm.update(updates[start:start + update_size])
+            start += update_size
+            count += 1
+        print(algorithm_class.__name__ + " : " + str(round((time.time() - started) * 1000 / count, 2)) +
+              " ms per update of " + str(update_size) + " lines")
+    expected = algorithm.predict_many(lines)
+
+    changed = sum(1 for a, b in zip(before, expected) if a != b)
+    replayed = algorithm_class(filename=FILENAME).predict_many(lines)
+    algorithm.compact()
+    ResourceCache.clear()
+    compacted = algorithm_class(filename=FILENAME).predict_many(lines)
+    print("    " + str(changed) + " predictions changed by the updates, replayed log " +
+          ("same" if replayed == expected else "DIFFERENT") + ", compacted model " +
+          ("same" if compacted == expected else "DIFFERENT") +
+          (", log left over" if UpdateLog.exists(filename) else ""))
+
+    os.remove(filename + Storage.DOT_ZIP)
+
+
+measure(UnigramSentimentMultinomialNB)
+measure(UnigramSentimentBernoulliNB)
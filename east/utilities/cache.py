@@ -0,0 +1,182 @@
+from collections import OrderedDict
+from itertools import islice
+import sys
+import threading
+
+import numpy
+from scipy.sparse import issparse
+
+from east.utilities.metrics import Metrics
+
+__author__ = 'bijoy'
+
+
+class ResourceCache:
+    """
+    A process wide cache of the loaded data sets, lexicons and models, keyed by the path of their file.
+    All the algorithm instances loading the same file share the same object,
+    and the least recently used objects are evicted once the memory budget is exceeded.
+    """
+    BUDGET = 1024 * 1024 * 1024
+    SAMPLE_SIZE = 100
+
+    entries = OrderedDict()
+    lock = threading.RLock()
+    stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+    # the keys being loaded (outside the lock) with the event set once they are loaded,
+    # and the ones of them invalidated meanwhile
+    loading = dict()
+    stale = set()
+
+    @staticmethod
+    def get(key, loader):
+        """
+        Returns the object for the key, loading it on a miss
+        (the loads do not hold the lock, the threads asking for a key being loaded wait for it instead of loading it again)
+        :param key: the key, usually the absolute path of the file
+        :param loader: the function that loads the object (the object is not cached if it returns None)
+        :return: the object
+        """
+        metrics = Metrics.active
+        while True:
+            with ResourceCache.lock:
+                if key in ResourceCache.entries:
+                    ResourceCache.stats["hits"] += 1
+                    if metrics:
+                        metrics.add_count(Metrics.CACHE_HITS)
+                    entry = ResourceCache.entries.pop(key)
+                    ResourceCache.entries[key] = entry
+                    return entry[0]
+
+                loaded = ResourceCache.loading.get(key)
+                if loaded is None:
+                    loaded = ResourceCache.loading[key] = threading.Event()
+                    ResourceCache.stats["misses"] += 1
+                    if metrics:
+                        metrics.add_count(Metrics.CACHE_MISSES)
+                    break
+
+            # another thread is loading the same key, its object is used once it is loaded
+            loaded.wait()
+
+        # the other keys are served while the object is loaded
+        value = None
+        try:
+            with Metrics.stage(Metrics.LOAD):
+                value = loader()
+        finally:
+            with ResourceCache.lock:
+                del ResourceCache.loading[key]
+                # an object invalidated while it was loaded may be the old one
+                stale = key in ResourceCache.stale
+                ResourceCache.stale.discard(key)
+                if value is not None and not stale:
+                    size = ResourceCache.get_size(value)
+                    ResourceCache.entries[key] = (value, size)
+                    ResourceCache.stats["bytes"] += size
+                    ResourceCache.evict()
+            loaded.set()
+        return value
+
+    @staticmethod
+    def evict():
+        """
+        Evicts the least recently used objects until the cache fits the budget (the last object is always kept)
+        :return: None
+        """
+        with ResourceCache.lock:
+            while ResourceCache.stats["bytes"] > ResourceCache.BUDGET and len(ResourceCache.entries) > 1:
+                key, (value, size) = ResourceCache.entries.popitem(last=False)
+                ResourceCache.stats["bytes"] -= size
+                ResourceCache.stats["evictions"] += 1
+
+    @staticmethod
+    def invalidate(key):
+        """
+        Removes the object for the key, the next get loads it again (for example after the model is retrained)
+        :param key: the key
+        :return: None
+        """
+        with ResourceCache.lock:
+            if key in ResourceCache.loading:
+                ResourceCache.stale.add(key)
+            entry = ResourceCache.entries.pop(key, None)
+            if entry:
+                ResourceCache.stats["bytes"] -= entry[1]
+
+    @staticmethod
+    def clear():
+        """
+        Removes all the objects and resets the stats
+        :return: None
+        """
+        with ResourceCache.lock:
+            ResourceCache.stale.update(ResourceCache.loading.keys())
+            ResourceCache.entries.clear()
+            for key in ResourceCache.stats.keys():
+                ResourceCache.stats[key] = 0
+
+    @staticmethod
+    def set_budget(budget):
+        """
+        Sets the memory budget of the cache
+        :param budget: the budget in bytes
+        :return: None
+        """
+        with ResourceCache.lock:
+            ResourceCache.BUDGET = budget
+            ResourceCache.evict()
+
+    @staticmethod
+    def get_stats():
+        """
+        Returns the statistics of the cache
+        :return: a dict with the hits, misses, evictions, bytes, number of entries and the budget
+        """
+        with ResourceCache.lock:
+            stats = dict(ResourceCache.stats)
+            stats["entries"] = len(ResourceCache.entries)
+            stats["budget"] = ResourceCache.BUDGET
+            return stats
+
+    @staticmethod
+    def get_size(value, visited=None):
+        """
+        Estimates the memory used by an object and everything it refers to
+        (memory mapped arrays are shared with the page cache and are not counted,
+        the containers with more than SAMPLE_SIZE items are extrapolated from their first items)
+        :param value: the object
+        :param visited: the ids of the objects already counted
+        :return: the size in bytes
+        """
+        if visited is None:
+            visited = set()
+        if id(value) in visited:
+            return 0
+        visited.add(id(value))
+
+        if isinstance(value, numpy.memmap):
+            return 0
+        if isinstance(value, numpy.ndarray):
+            return value.nbytes if value.base is None else 0
+        if issparse(value):
+            return sum(ResourceCache.get_size(array, visited) for array in value.__dict__.values())
+
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            items = list(islice(value.items(), ResourceCache.SAMPLE_SIZE))
+            items_size = sum(ResourceCache.get_size(key, visited) + ResourceCache.get_size(item, visited)
+                             for key, item in items)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            items = list(islice(value, ResourceCache.SAMPLE_SIZE))
+            items_size = sum(ResourceCache.get_size(item, visited) for item in items)
+        elif hasattr(value, '__dict__'):
+            return size + ResourceCache.get_size(value.__dict__, visited)
+        else:
+            return size
+
+        # the large containers are estimated from a sample of their items
+        if items:
+            size += items_size * len(value) // len(items)
+        return size
@@ -0,0 +1,103 @@
+import numpy
+
+__author__ = 'bijoy'
+
+
+class CompactTable:
+    """
+    A read-only table of sorted byte string keys and a parallel array of values.
+    Both the arrays are stored as .npy files and are memory mapped when loaded,
+    so all the processes using the table share a single copy in the page cache.
+    """
+    KEYS = '.keys.npy'
+    VALUES = '.values.npy'
+
+    def __init__(self, keys, values):
+        """
+        :param keys: a sorted numpy array of byte strings
+        :param values: a numpy array with a row for each of the keys
+        """
+        self.keys = keys
+        self.values = values
+
+    @staticmethod
+    def create(mapping, dtype):
+        """
+        Creates a table from a dict
+        :param mapping: the dict object mapping a (byte string, UTF-8 for the text) key to its value
+        :param dtype: the numpy type of the values
+        :return: the table
+        """
+        keys = sorted(mapping.keys())
+        values = numpy.array([mapping[key] for key in keys], dtype=dtype)
+        return CompactTable(numpy.array(keys, dtype=bytes), values)
+
+    @staticmethod
+    def load(path):
+        """
+        Tries to memory map a table stored at the path
+        :param path: the path of the table (without the extensions)
+        :return: the table, None if it could not be loaded
+        """
+        try:
+            keys = numpy.load(path + CompactTable.KEYS, mmap_mode='r')
+            values = numpy.load(path + CompactTable.VALUES, mmap_mode='r')
+        except (IOError, OSError, ValueError):
+            return None
+        return CompactTable(keys, values)
+
+    def dump(self, path):
+        """
+        Stores the table at the path
+        :param path: the path of the table (without the extensions)
+        :return: None
+        """
+        numpy.save(path + CompactTable.KEYS, self.keys)
+        numpy.save(path + CompactTable.VALUES, self.values)
+
+    def lookup(self, keys):
+        """
+        Finds the position of each of the keys with a binary search
+        :param keys: the list of keys, the unicode keys are encoded to UTF-8 (as the keys of the table)
+        :return: a numpy array with the position of each of the keys, -1 for the keys not in the table
+        """
+        if len(self.keys) == 0 or len(keys) == 0:
+            return numpy.full(len(keys), -1, dtype=numpy.int64)
+
+        key_length = self.keys.dtype.itemsize
+        queries = list()
+        fits = numpy.ones(len(keys), dtype=bool)
+        for index, key in enumerate(keys):
+            if not isinstance(key, bytes):
+                try:
+                    key = key.encode('utf-8')
+                except UnicodeError:
+                    key = b''
+                    fits[index] = False
+            # the longer keys would get truncated to the width of the table and can not be in it
+            if len(key) > key_length:
+                fits[index] = False
+            queries.append(key)
+
+        queries = numpy.array(queries, dtype=self.keys.dtype)
+        positions = numpy.minimum(numpy.searchsorted(self.keys, queries), len(self.keys) - 1)
+        found = (self.keys[positions] == queries) & fits
+        return numpy.where(found, positions, -1)
+
+    def get(self, key, default=None):
+        """
+        Returns the value for a key
+        :param key: the key
+        :param default: the value returned if the key is not in the table
+        :return: the value
+        """
+        position = self.lookup([key])[0]
+        if position < 0:
+            return default
+        return self.values[position]
+
+    def __contains__(self, key):
+        return self.lookup([key])[0] >= 0
+
+    def __len__(self):
+        return len(self.keys)
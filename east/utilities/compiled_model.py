@@ -0,0 +1,170 @@
+import json
+import os
+
+import numpy
+from scipy.sparse import issparse
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB, BernoulliNB, MultinomialNB
+
+from east.utilities.compact import CompactTable
+from east.utilities.features import Features
+
+__author__ = 'bijoy'
+
+
+class CompiledModel:
+    """
+    A naive bayes or a linear engine exported to plain numpy arrays.
+    The arrays (and the vocabulary) are memory mapped when loaded, so loading a model is a page cache map,
+    and all the processes using the model share a single copy of it.
+    It only supports predict, with the same results as the engine.
+    """
+    EXTENSION = '.compiled'
+    META = '.json'
+    VOCABULARY = '.vocabulary'
+    # the names of the arrays of all the kinds of models
+    ARRAYS = ['classes', 'coefficients', 'intercepts', 'inverse_variance']
+
+    LINEAR = 'linear'
+    BINARY_LINEAR = 'binary_linear'
+    GAUSSIAN = 'gaussian'
+
+    def __init__(self, kind, arrays, binarize=None):
+        """
+        :param kind: LINEAR, BINARY_LINEAR or GAUSSIAN
+        :param arrays: the dict of the numpy arrays of the model
+        :param binarize: the threshold for binarizing the features (for bernoulli naive bayes)
+        """
+        self.kind = kind
+        self.arrays = arrays
+        self.binarize = binarize
+
+    @staticmethod
+    def compile(engine):
+        """
+        Converts a fitted engine to a compiled model
+        :param engine: a fitted MultinomialNB, BernoulliNB, GaussianNB or LogisticRegression
+        :return: the compiled model
+        """
+        if isinstance(engine, MultinomialNB):
+            return CompiledModel(CompiledModel.LINEAR, {
+                'classes': engine.classes_,
+                'coefficients': engine.feature_log_prob_,
+                'intercepts': engine.class_log_prior_})
+
+        if isinstance(engine, BernoulliNB):
+            # the log probability of the absent features is folded into the coefficients and the intercepts
+            negative_log_prob = numpy.log(1 - numpy.exp(engine.feature_log_prob_))
+            return CompiledModel(CompiledModel.LINEAR, {
+                'classes': engine.classes_,
+                'coefficients': engine.feature_log_prob_ - negative_log_prob,
+                'intercepts': engine.class_log_prior_ + negative_log_prob.sum(axis=1)}, engine.binarize)
+
+        if isinstance(engine, GaussianNB):
+            # -(x - mean)^2 / 2 variance is expanded, so that the sparse features never need to be densified
+            variance = engine.var_ if hasattr(engine, 'var_') else engine.sigma_
+            inverse_variance = 1.0 / variance
+            intercepts = numpy.log(engine.class_prior_) - 0.5 * numpy.log(2 * numpy.pi * variance).sum(axis=1) \
+                - 0.5 * (engine.theta_ ** 2 * inverse_variance).sum(axis=1)
+            return CompiledModel(CompiledModel.GAUSSIAN, {
+                'classes': engine.classes_,
+                'coefficients': engine.theta_ * inverse_variance,
+                'inverse_variance': inverse_variance,
+                'intercepts': intercepts})
+
+        if isinstance(engine, LogisticRegression):
+            kind = CompiledModel.BINARY_LINEAR if engine.coef_.shape[0] == 1 else CompiledModel.LINEAR
+            return CompiledModel(kind, {
+                'classes': engine.classes_,
+                'coefficients': engine.coef_,
+                'intercepts': engine.intercept_})
+
+        raise ValueError(engine.__class__.__name__ + " can not be compiled")
+
+    @staticmethod
+    def export(path, engine, word_set=None, hash_buckets=None):
+        """
+        Compiles the engine and stores it along with its vocabulary
+        :param path: the path of the model (without the extensions)
+        :param engine: the fitted engine
+        :param word_set: the dict mapping a word to its column (if any)
+        :param hash_buckets: the number of hash buckets (if the features are hashed)
+        :return: None
+        """
+        model = CompiledModel.compile(engine)
+        path += CompiledModel.EXTENSION
+        for name, array in model.arrays.items():
+            numpy.save(path + '.' + name + '.npy', numpy.ascontiguousarray(array))
+
+        if word_set:
+            words = dict((Features.encode_word(word), column) for word, column in word_set.items())
+            CompactTable.create(words, numpy.int32).dump(path + CompiledModel.VOCABULARY)
+
+        meta = {'kind': model.kind,
+                'arrays': sorted(model.arrays.keys()),
+                'binarize': model.binarize,
+                'vocabulary': bool(word_set),
+                'hash_buckets': hash_buckets}
+        with open(path + CompiledModel.META, 'w') as meta_file:
+            json.dump(meta, meta_file)
+
+    @staticmethod
+    def load(path):
+        """
+        Tries to memory map a compiled model
+        :param path: the path of the model (without the extensions)
+        :return: a tuple (model, word set, hash buckets), None if there is no compiled model at the path
+        """
+        path += CompiledModel.EXTENSION
+        try:
+            with open(path + CompiledModel.META, 'r') as meta_file:
+                meta = json.load(meta_file)
+            arrays = dict((name, numpy.load(path + '.' + name + '.npy', mmap_mode='r')) for name in meta['arrays'])
+        except (IOError, OSError, ValueError):
+            return None
+
+        word_set = dict()
+        if meta['vocabulary']:
+            word_set = CompactTable.load(path + CompiledModel.VOCABULARY)
+            if word_set is None:
+                return None
+
+        return CompiledModel(meta['kind'], arrays, meta['binarize']), word_set, meta['hash_buckets']
+
+    @staticmethod
+    def remove(path):
+        """
+        Removes the compiled model at the path (if any), so that it does not shadow a newly trained model
+        :param path: the path of the model (without the extensions)
+        :return: None
+        """
+        path += CompiledModel.EXTENSION
+        # the meta file first, so that a half removed model is never loaded
+        paths = [path + CompiledModel.META]
+        paths += [path + '.' + name + '.npy' for name in CompiledModel.ARRAYS]
+        paths += [path + CompiledModel.VOCABULARY + extension for extension in [CompactTable.KEYS, CompactTable.VALUES]]
+        for file_path in paths:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def predict(self, matrix):
+        """
+        Predicts the class for each row of the feature matrix
+        :param matrix: the sparse (or dense) feature matrix
+        :return: the array of classes
+        """
+        if not issparse(matrix):
+            matrix = numpy.asarray(matrix, dtype=numpy.float64)
+        if self.binarize is not None:
+            matrix = matrix > self.binarize
+            matrix = matrix.astype(numpy.float64)
+
+        scores = matrix.dot(self.arrays['coefficients'].T) + self.arrays['intercepts']
+        if self.kind == CompiledModel.GAUSSIAN:
+            squares = matrix.multiply(matrix) if issparse(matrix) else matrix ** 2
+            scores -= 0.5 * squares.dot(self.arrays['inverse_variance'].T)
+
+        classes = self.arrays['classes']
+        if self.kind == CompiledModel.BINARY_LINEAR:
+            return classes[(numpy.asarray(scores).ravel() > 0).astype(int)]
+        return classes[numpy.asarray(scores).argmax(axis=1)]
@@ -0,0 +1,223 @@
+import zlib
+
+import numpy
+from scipy.sparse import csr_matrix
+from sklearn.base import clone
+from sklearn.naive_bayes import GaussianNB
+from sklearn.svm import SVC
+
+from east.utilities.compact import CompactTable
+
+__author__ = 'bijoy'
+
+
+class Features:
+    """Builds sparse feature matrices and feeds them to the engines"""
+
+    # memory used by the rows densified at a time for the engines which do not accept sparse input
+    CHUNK_BYTES = 64 * 1024 * 1024
+
+    # joins the words of a bigram into a single key
+    KEY_SEPARATOR = '\x1f'
+
+    @staticmethod
+    def create_word_matrix(word_lists, word_set):
+        """
+        Creates a sparse (CSR) binary matrix, with a row for each list of words and a column for each word in the word set
+        :param word_lists: an iterable of lists of words
+        :param word_set: the dict (or the compact table) mapping a word to its column
+        :return: the sparse matrix
+        """
+        if isinstance(word_set, CompactTable):
+            return Features.create_compact_matrix(word_lists, word_set)
+
+        indices = list()
+        indptr = [0]
+        for words in word_lists:
+            columns = set()
+            for word in words:
+                column = word_set.get(word)
+                if column is not None:
+                    columns.add(column)
+            indices.extend(columns)
+            indptr.append(len(indices))
+
+        data = numpy.ones(len(indices), dtype=numpy.float64)
+        return csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(word_set)))
+
+    @staticmethod
+    def create_compact_matrix(word_lists, word_table):
+        """
+        Same as create_word_matrix, with all the words looked up in the compact table at once
+        :param word_lists: an iterable of lists of words
+        :param word_table: the compact table mapping an encoded word to its column
+        :return: the sparse matrix
+        """
+        keys = list()
+        indptr = [0]
+        for words in word_lists:
+            keys.extend(Features.encode_word(word) for word in words)
+            indptr.append(len(keys))
+
+        positions = word_table.lookup(keys)
+        found = positions >= 0
+        rows = numpy.repeat(numpy.arange(len(indptr) - 1), numpy.diff(indptr))[found]
+        columns = word_table.values[positions[found]]
+
+        # the repeated words add up to more than 1, the matrix is binary
+        matrix = csr_matrix((numpy.ones(len(rows), dtype=numpy.float64), (rows, columns)),
+                            shape=(len(indptr) - 1, len(word_table)))
+        matrix.data[:] = 1.0
+        return matrix
+
+    @staticmethod
+    def encode_word(word):
+        """
+        Encodes a word (or a bigram tuple) to a single byte string
+        :param word: the word or the tuple of words
+        :return: the byte string
+        """
+        if isinstance(word, tuple):
+            word = Features.KEY_SEPARATOR.join(word)
+        if not isinstance(word, bytes):
+            word = word.encode('utf-8')
+        return word
+
+    @staticmethod
+    def hash_word(word, hash_buckets):
+        """
+        Hashes a word (or a bigram tuple) to a column, the hash is stable across processes
+        :param word: the word or the tuple of words
+        :param hash_buckets: the number of columns
+        :return: the column of the word
+        """
+        return (zlib.crc32(Features.encode_word(word)) & 0xffffffff) % hash_buckets
+
+    @staticmethod
+    def create_hashed_matrix(word_lists, hash_buckets):
+        """
+        Creates a sparse (CSR) binary matrix, with a row for each list of words and the words hashed to the columns
+        :param word_lists: an iterable of lists of words
+        :param hash_buckets: the number of columns
+        :return: the sparse matrix
+        """
+        indices = list()
+        indptr = [0]
+        for words in word_lists:
+            indices.extend(set(Features.hash_word(word, hash_buckets) for word in words))
+            indptr.append(len(indices))
+
+        data = numpy.ones(len(indices), dtype=numpy.float64)
+        return csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, hash_buckets))
+
+    @staticmethod
+    def requires_dense(engine):
+        """
+        Returns true if the engine can only work with dense matrices
+        :param engine: the engine
+        :return: does the engine require a dense matrix (True / False)
+        """
+        if isinstance(engine, GaussianNB):
+            return True
+
+        # a support vector machine trained over dense data can not predict over sparse data
+        return isinstance(engine, SVC) and hasattr(engine, 'support_') and not getattr(engine, '_sparse', False)
+
+    @staticmethod
+    def get_chunks(matrix):
+        """
+        Splits the matrix into dense chunks of rows, each of them within CHUNK_BYTES (the wide matrices,
+        like the hashed ones, have fewer rows per chunk)
+        :param matrix: the sparse matrix
+        :return: a generator of (start, dense chunk) tuples
+        """
+        chunk_size = max(1, Features.CHUNK_BYTES // (matrix.dtype.itemsize * max(1, matrix.shape[1])))
+        for start in range(0, matrix.shape[0], chunk_size):
+            yield start, matrix[start:start + chunk_size].toarray()
+
+    @staticmethod
+    def fit(engine, matrix, classes):
+        """
+        Fits a fresh copy of the engine over the sparse matrix
+        :param engine: the engine (only its parameters are used)
+        :param matrix: the sparse feature matrix
+        :param classes: the list of class ids for each row
+        :return: the fitted engine
+        """
+        engine = clone(engine)
+        classes = numpy.asarray(classes)
+
+        if not Features.requires_dense(engine):
+            engine.fit(matrix, classes)
+            return engine
+
+        # the variance smoothing of partial_fit only looks at the current chunk,
+        # so it is switched off while fitting and applied over the whole matrix at the end
+        var_smoothing = engine.get_params().get('var_smoothing')
+        if var_smoothing is not None:
+            engine.set_params(var_smoothing=0.0)
+
+        all_classes = numpy.unique(classes)
+        for start, chunk in Features.get_chunks(matrix):
+            engine.partial_fit(chunk, classes[start:start + len(chunk)], all_classes)
+
+        if var_smoothing is not None:
+            engine.set_params(var_smoothing=var_smoothing)
+            Features.smooth_variance(engine, matrix, var_smoothing)
+        return engine
+
+    @staticmethod
+    def partial_fit(engine, matrix, classes, all_classes):
+        """
+        Updates the engine with more rows (the engine must have partial_fit, like the naive bayes engines)
+        :param engine: the engine, fresh or already updated
+        :param matrix: the sparse feature matrix
+        :param classes: the list of class ids for each row
+        :param all_classes: the list of all the class ids, as some may be missing from the rows
+        :return: None
+        """
+        classes = numpy.asarray(classes)
+
+        # the classes not seen yet have a log prior of log(0)
+        with numpy.errstate(divide='ignore'):
+            if not Features.requires_dense(engine):
+                engine.partial_fit(matrix, classes, all_classes)
+                return
+
+            for start, chunk in Features.get_chunks(matrix):
+                engine.partial_fit(chunk, classes[start:start + len(chunk)], all_classes)
+
+    @staticmethod
+    def smooth_variance(engine, matrix, var_smoothing):
+        """
+        Boosts the variances of a gaussian naive bayes engine by a fraction of the largest feature variance
+        (same as GaussianNB.fit does over a complete dense matrix)
+        :param engine: the fitted gaussian naive bayes engine
+        :param matrix: the sparse feature matrix the engine was fitted over
+        :param var_smoothing: the fraction of the largest variance to add
+        :return: None
+        """
+        mean = numpy.asarray(matrix.mean(axis=0)).ravel()
+        square_mean = numpy.asarray(matrix.multiply(matrix).mean(axis=0)).ravel()
+        epsilon = var_smoothing * (square_mean - mean ** 2).max()
+
+        # the attribute was renamed from sigma_ to var_ in newer versions of scikit-learn
+        variance = engine.var_ if hasattr(engine, 'var_') else engine.sigma_
+        variance += epsilon
+        engine.epsilon_ = epsilon
+
+    @staticmethod
+    def predict(engine, matrix):
+        """
+        Predicts the class ids for each row of the sparse matrix
+        :param engine: the fitted engine
+        :param matrix: the sparse feature matrix
+        :return: the list of class ids
+        """
+        if not Features.requires_dense(engine):
+            return engine.predict(matrix)
+
+        predictions = list()
+        for start, chunk in Features.get_chunks(matrix):
+            predictions.extend(engine.predict(chunk))
+        return predictions
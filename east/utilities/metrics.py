@@ -0,0 +1,274 @@
+from collections import defaultdict
+import bisect
+import heapq
+import threading
+import timeit
+
+__author__ = 'bijoy'
+
+
+class Histogram:
+    """
+    Counts the values falling in each bucket, the buckets are given by their upper bounds
+    """
+
+    def __init__(self, bounds):
+        """
+        :param bounds: the sorted upper bounds of the buckets, the values above the last one go to a last bucket
+        """
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def get_percentile(self, percentile):
+        """
+        :param percentile: the percentile (0 - 100)
+        :return: the upper bound of the bucket holding the percentile (the maximum for the last bucket)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = self.count * percentile / 100.0
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+    def get_stats(self):
+        """
+        :return: a dict with the count, mean, maximum, percentiles and the count of each bucket
+        """
+        buckets = [("<=" + str(bound), count) for bound, count in zip(self.bounds, self.counts)]
+        buckets.append((">" + str(self.bounds[-1]), self.counts[-1]))
+        return {"count": self.count,
+                "mean": round(self.total / self.count, 3) if self.count else 0.0,
+                "max": round(self.maximum, 3),
+                "p50": round(self.get_percentile(50), 3),
+                "p95": round(self.get_percentile(95), 3),
+                "p99": round(self.get_percentile(99), 3),
+                "buckets": [{"le": bound, "count": count} for bound, count in buckets]}
+
+
+class StageTimer:
+    """
+    Times a stage of the analysis, as a with statement
+    """
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = None
+
+    def __enter__(self):
+        self.start = timeit.default_timer()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        self.metrics.add_time(self.stage, timeit.default_timer() - self.start)
+        return False
+
+
+class NoTimer:
+    """
+    Stands in for the StageTimer while the metrics are disabled
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        return False
+
+
+NO_TIMER = NoTimer()
+
+
+class Metrics:
+    """
+    The time spent in each stage of the analysis, a few counters and the slowest documents analysed alone
+    (the documents of a larger batch share its time, they are not ranked).
+    The metrics are disabled by default, the hooks of the pipeline then only check Metrics.active.
+    They are process wide, as the stages run in code shared by all the algorithms (Text, ResourceCache).
+
+    The stages nest: analyse holds split_document, sentence_level and document_level, sentence_level holds
+    normalize (which holds tokenize), vectorize and predict, and load is the first use of a model or lexicon.
+
+    metrics = Metrics.enable()
+    Toolkit().analyse_many(documents)
+    print(metrics.to_prometheus())
+    """
+    ANALYSE = 'analyse'
+    SPLIT_DOCUMENT = 'split_document'
+    SENTENCE_LEVEL = 'sentence_level'
+    NORMALIZE = 'normalize'
+    TOKENIZE = 'tokenize'
+    VECTORIZE = 'vectorize'
+    PREDICT = 'predict'
+    DOCUMENT_LEVEL = 'document_level'
+    LOAD = 'load'
+
+    DOCUMENTS = 'documents'
+    SENTENCES = 'sentences'
+    CACHE_HITS = 'cache_hits'
+    CACHE_MISSES = 'cache_misses'
+
+    # seconds, as prometheus expects
+    STAGE_BOUNDS = [0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+    SLOWEST_INPUTS = 20
+    MAX_INPUT_LENGTH = 200
+
+    # the metrics the hooks report to, None while disabled
+    active = None
+
+    def __init__(self, callback=None, slowest_inputs=SLOWEST_INPUTS):
+        """
+        :param callback: a function called with (stage, seconds) for every stage timed, to forward the timings
+        :param slowest_inputs: the number of slowest documents kept
+        """
+        self.callback = callback
+        self.slowest_inputs = slowest_inputs
+        self.lock = threading.Lock()
+        self.stages = dict()
+        self.counters = defaultdict(int)
+        # a min heap of (seconds, document), the fastest of the slowest documents is replaced first
+        self.slowest = list()
+
+    @staticmethod
+    def enable(metrics=None):
+        """
+        Enables the instrumentation of the pipeline
+        :param metrics: the metrics object to report to, a new one if None
+        :return: the metrics object
+        """
+        Metrics.active = metrics if metrics is not None else Metrics()
+        return Metrics.active
+
+    @staticmethod
+    def disable():
+        """
+        Disables the instrumentation, the hooks go back to doing nothing
+        :return: the metrics object that was active (None if there was none)
+        """
+        metrics = Metrics.active
+        Metrics.active = None
+        return metrics
+
+    @staticmethod
+    def stage(stage):
+        """
+        Times a stage, if the metrics are enabled
+        with Metrics.stage(Metrics.PREDICT):
+            ...
+        :param stage: the name of the stage
+        :return: the timer, to use in a with statement
+        """
+        metrics = Metrics.active
+        if metrics is None:
+            return NO_TIMER
+        return StageTimer(metrics, stage)
+
+    def add_time(self, stage, seconds):
+        """
+        :param stage: the name of the stage
+        :param seconds: the time spent in the stage
+        :return: None
+        """
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.STAGE_BOUNDS)
+            histogram.add(seconds)
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    def add_count(self, counter, value=1):
+        """
+        :param counter: the name of the counter
+        :param value: the value to add
+        :return: None
+        """
+        with self.lock:
+            self.counters[counter] += value
+
+    def add_input(self, document, seconds):
+        """
+        Keeps the document if it is one of the slowest analysed
+        :param document: the document
+        :param seconds: the time spent analysing it alone
+        :return: None
+        """
+        if self.slowest_inputs <= 0:
+            return
+        with self.lock:
+            if len(self.slowest) < self.slowest_inputs:
+                heapq.heappush(self.slowest, (seconds, document[:self.MAX_INPUT_LENGTH]))
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (seconds, document[:self.MAX_INPUT_LENGTH]))
+
+    def get_slowest_inputs(self):
+        """
+        :return: the list of the slowest documents (cut to MAX_INPUT_LENGTH), slowest first, with their time in ms
+        """
+        with self.lock:
+            slowest = sorted(self.slowest, reverse=True)
+        return [{"ms": round(seconds * 1000, 3), "document": document} for seconds, document in slowest]
+
+    def get_stats(self):
+        """
+        :return: a dict with the count, total time and time percentiles (in ms) of each stage,
+        the counters and the slowest documents
+        """
+        with self.lock:
+            stages = dict((stage, {"count": histogram.count,
+                                   "seconds": round(histogram.total, 6),
+                                   "mean_ms": round(histogram.total * 1000 / histogram.count, 4),
+                                   "p50_ms": round(histogram.get_percentile(50) * 1000, 4),
+                                   "p95_ms": round(histogram.get_percentile(95) * 1000, 4),
+                                   "p99_ms": round(histogram.get_percentile(99) * 1000, 4),
+                                   "max_ms": round(histogram.maximum * 1000, 4)})
+                          for stage, histogram in self.stages.items())
+            counters = dict(self.counters)
+        return {"stages": stages, "counters": counters, "slowest_inputs": self.get_slowest_inputs()}
+
+    def to_prometheus(self):
+        """
+        :return: the stage histograms and the counters in the prometheus text format
+        """
+        lines = ["# HELP east_stage_seconds The time spent in each stage of the analysis",
+                 "# TYPE east_stage_seconds histogram"]
+        with self.lock:
+            for stage in sorted(self.stages.keys()):
+                histogram = self.stages[stage]
+                seen = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    seen += count
+                    lines.append('east_stage_seconds_bucket{stage="%s",le="%r"} %d' % (stage, bound, seen))
+                lines.append('east_stage_seconds_bucket{stage="%s",le="+Inf"} %d' % (stage, histogram.count))
+                lines.append('east_stage_seconds_sum{stage="%s"} %r' % (stage, histogram.total))
+                lines.append('east_stage_seconds_count{stage="%s"} %d' % (stage, histogram.count))
+
+            lines.append("# HELP east_events_total The documents and sentences analysed and the resource cache lookups")
+            lines.append("# TYPE east_events_total counter")
+            for counter in sorted(self.counters.keys()):
+                lines.append('east_events_total{event="%s"} %d' % (counter, self.counters[counter]))
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Clears the timings, counters and slowest documents
+        :return: None
+        """
+        with self.lock:
+            self.stages = dict()
+            self.counters = defaultdict(int)
+            self.slowest = list()
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import threading
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+__author__ = 'bijoy'
+
+
+class PredictionStore:
+    """
+    The predictions kept in a SQLite file across runs, by model fingerprint and key (the md5 of the sentence or
+    document). The file uses the write ahead log, so many processes can read it while one of them writes,
+    and the forked processes open their own connection.
+    """
+    # the keys looked up per query (SQLite allows 999 variables per query)
+    BATCH_SIZE = 500
+
+    def __init__(self, path, timeout=30.0):
+        """
+        :param path: the path of the SQLite file, created if needed
+        :param timeout: the seconds a write waits for the other writers
+        """
+        self.path = path
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.connection = None
+        self.pid = None
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    def get_connection(self):
+        """
+        Opens the file (again in a forked process, a connection must not be used by two processes)
+        (must be called with the lock)
+        :return: the connection
+        """
+        if self.connection is None or self.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS predictions (model TEXT NOT NULL, key BLOB NOT NULL, '
+                               'value BLOB NOT NULL, PRIMARY KEY (model, key)) WITHOUT ROWID')
+            connection.commit()
+            self.connection = connection
+            self.pid = os.getpid()
+        return self.connection
+
+    def get_many(self, model, keys):
+        """
+        Looks up the keys, BATCH_SIZE keys per query
+        :param model: the fingerprint of the model
+        :param keys: the list of keys (md5 digests)
+        :return: a dict object with the values of the keys found
+        """
+        unique_keys = list(set(keys))
+        values = dict()
+        with self.lock:
+            connection = self.get_connection()
+            for start in range(0, len(unique_keys), self.BATCH_SIZE):
+                batch = unique_keys[start:start + self.BATCH_SIZE]
+                rows = connection.execute('SELECT key, value FROM predictions WHERE model = ? AND key IN (' +
+                                          ', '.join('?' * len(batch)) + ')',
+                                          [model] + [sqlite3.Binary(key) for key in batch])
+                for key, value in rows:
+                    values[bytes(key)] = pickle.loads(bytes(value))
+            self.stats["hits"] += len(values)
+            self.stats["misses"] += len(unique_keys) - len(values)
+        return values
+
+    def put_many(self, model, items):
+        """
+        Stores the values in a single transaction
+        :param model: the fingerprint of the model
+        :param items: a list of (key, value) tuples
+        :return: None
+        """
+        rows = [(model, sqlite3.Binary(key), sqlite3.Binary(pickle.dumps(value, 2))) for key, value in items]
+        with self.lock:
+            connection = self.get_connection()
+            with connection:
+                connection.executemany('INSERT OR REPLACE INTO predictions (model, key, value) VALUES (?, ?, ?)', rows)
+            self.stats["writes"] += len(rows)
+
+    def remove_model(self, model):
+        """
+        Removes the values of a model, like the ones of a model which is not used anymore
+        :param model: the fingerprint of the model
+        :return: the number of values removed
+        """
+        with self.lock:
+            connection = self.get_connection()
+            with connection:
+                return connection.execute('DELETE FROM predictions WHERE model = ?', (model,)).rowcount
+
+    def get_stats(self):
+        """
+        :return: a dict with the keys found, the keys not found and the values written by this process
+        """
+        with self.lock:
+            return dict(self.stats)
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None and self.pid == os.getpid():
+                self.connection.close()
+            self.connection = None
@@ -1,5 +1,12 @@
-import pickle
 import gzip
+import hashlib
+import os
+import zlib
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 __author__ = 'bijoy'
 
@@ -7,6 +14,9 @@ __author__ = 'bijoy'
 class Storage:
     DOT_ZIP = '.zip'
 
+    # the md5 of the files loaded and dumped, by path (see get_fingerprint)
+    fingerprints = dict()
+
     @staticmethod
     def dump(path, variable):
         """
@@ -17,6 +27,7 @@ class Storage:
         """
         with gzip.open(path + Storage.DOT_ZIP, 'wb') as f:
             pickle.dump(variable, f)
+        Storage.fingerprints.pop(path, None)
 
     @staticmethod
     def load(path):
@@ -26,7 +37,26 @@ class Storage:
         :return: the variable
         """
         try:
-            with gzip.open(path + Storage.DOT_ZIP, 'rb') as f:
-                return pickle.load(f)
+            with open(path + Storage.DOT_ZIP, 'rb') as f:
+                data = f.read()
+            Storage.fingerprints[path] = hashlib.md5(data).hexdigest()
+            # decompressing the whole file at once is much faster than unpickling from the gzip stream
+            return pickle.loads(zlib.decompress(data, 16 + zlib.MAX_WBITS))
         except:
             return None
+
+    @staticmethod
+    def get_fingerprint(path):
+        """
+        Returns the md5 of the pickled file, as it was when it was last loaded (or of the file now if it was not)
+        :param path: the path of the pickle file
+        :return: the md5 (hex), None if there is no file
+        """
+        fingerprint = Storage.fingerprints.get(path)
+        if fingerprint is None and os.path.exists(path + Storage.DOT_ZIP):
+            md5 = hashlib.md5()
+            with open(path + Storage.DOT_ZIP, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    md5.update(block)
+            fingerprint = Storage.fingerprints[path] = md5.hexdigest()
+        return fingerprint
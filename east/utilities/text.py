@@ -1,29 +1,32 @@
+import importlib
 import re
 import logging
+import threading
+import timeit
 
-has_nltk_tokenizer = True
-try:
-    from nltk.tokenize import TweetTokenizer
-except ImportError:
-    logging.warning("nltk TweetTokenizer not found, please install / download to improve performance")
-    has_nltk_tokenizer = False
-
-has_nltk_lemmatizer = True
-try:
-    from nltk.stem.wordnet import WordNetLemmatizer
-except ImportError:
-    logging.warning("nltk WordNetLemmatizer not found, please install / download to improve performance")
-    has_nltk_lemmatizer = False
-
-has_nltk_data = True
-try:
-    import nltk.data
-except ImportError:
-    logging.warning("nltk.data not found, please install / download to improve performance")
-    has_nltk_data = False
+from east.utilities.metrics import Metrics
+from east.utilities.tweet_tokenizer import FastTweetTokenizer
 
 __author__ = 'bijoy'
 
+nltk_parts = dict()
+
+
+def import_nltk(module_name, name):
+    """
+    Imports a part of nltk on its first use, as importing nltk takes about a second
+    :param module_name: the nltk module
+    :param name: the name of the class / function in the module
+    :return: the class / function, None if nltk is not installed
+    """
+    if (module_name, name) not in nltk_parts:
+        try:
+            nltk_parts[(module_name, name)] = getattr(importlib.import_module(module_name), name)
+        except (ImportError, AttributeError):
+            logging.warning(module_name + "." + name + " not found, please install / download to improve performance")
+            nltk_parts[(module_name, name)] = None
+    return nltk_parts[(module_name, name)]
+
 
 class Text:
     """Some basic text processing functions"""
@@ -31,13 +34,85 @@ class Text:
                       'isn\'t']
     STOP_WORDS = ['the', 'as', 'like', 'is', 'a', 'an', 'in', 'on', 'of']
 
-    def __init__(self):
-        if has_nltk_tokenizer:
-            self.tokenizer = TweetTokenizer()
-        if has_nltk_lemmatizer:
-            self.lemmatizer = WordNetLemmatizer()
-        if has_nltk_data:
-            self.sentence_detector = nltk.data.load('tokenizers/punkt/english.pickle')
+    ALPHANUMERIC_RE = re.compile('[a-zA-Z0-9]')
+    ESCAPE_RE = re.compile(r'[\\\x80-\xff]')
+    NEGATIVE_WORD_SET = frozenset(NEGATIVE_WORDS)
+    STOP_WORD_SET = frozenset(STOP_WORDS)
+
+    # the memo of the lemmas of the words seen by normalize, cleared when it grows past the limit
+    lemmas = dict()
+    LEMMA_CACHE_SIZE = 100000
+
+    # The nltk tools are shared by all the instances in the process. Each one is created on its first use
+    # (False if nltk is not installed), so nltk is not imported, punkt not loaded and WordNet not read
+    # unless they are actually needed
+    tokenizer = None
+    lemmatizer = None
+    sentence_detector = None
+    lock = threading.Lock()
+
+    # The tokenizers: NLTK_TOKENIZER for the nltk TweetTokenizer, FAST_TOKENIZER for the built-in one
+    # giving the same tokens without nltk (also used whenever nltk is not installed).
+    # Setting DEFAULT_TOKENIZER selects the tokenizer of all the instances which do not choose one.
+    NLTK_TOKENIZER = 'nltk'
+    FAST_TOKENIZER = 'fast'
+    DEFAULT_TOKENIZER = NLTK_TOKENIZER
+    fast_tokenizer = FastTweetTokenizer()
+
+    def __init__(self, tokenizer_type=None):
+        """
+        :param tokenizer_type: NLTK_TOKENIZER or FAST_TOKENIZER, None for the DEFAULT_TOKENIZER
+        """
+        self.tokenizer_type = tokenizer_type
+
+    def get_tokenizer_type(self):
+        """
+        :return: the tokenizer used by tokenize, NLTK_TOKENIZER or FAST_TOKENIZER
+        """
+        return self.tokenizer_type or Text.DEFAULT_TOKENIZER
+
+    @staticmethod
+    def get_tokenizer():
+        """
+        Returns the shared nltk TweetTokenizer, creating it on the first use
+        :return: the tokenizer, False if nltk is not installed
+        """
+        if Text.tokenizer is None:
+            with Text.lock:
+                if Text.tokenizer is None:
+                    tokenizer_class = import_nltk('nltk.tokenize', 'TweetTokenizer')
+                    Text.tokenizer = tokenizer_class() if tokenizer_class else False
+        return Text.tokenizer
+
+    @staticmethod
+    def get_lemmatizer():
+        """
+        Returns the shared nltk WordNetLemmatizer, creating it (and reading WordNet) on the first use
+        :return: the lemmatizer, False if nltk is not installed
+        """
+        if Text.lemmatizer is None:
+            with Text.lock:
+                if Text.lemmatizer is None:
+                    lemmatizer_class = import_nltk('nltk.stem.wordnet', 'WordNetLemmatizer')
+                    lemmatizer = lemmatizer_class() if lemmatizer_class else False
+                    if lemmatizer:
+                        # WordNet is read lazily by nltk, which is not thread safe, so it is read here
+                        lemmatizer.lemmatize('words')
+                    Text.lemmatizer = lemmatizer
+        return Text.lemmatizer
+
+    @staticmethod
+    def get_sentence_detector():
+        """
+        Returns the shared nltk punkt sentence detector, loading it on the first use
+        :return: the sentence detector, False if nltk is not installed
+        """
+        if Text.sentence_detector is None:
+            with Text.lock:
+                if Text.sentence_detector is None:
+                    load = import_nltk('nltk.data', 'load')
+                    Text.sentence_detector = load('tokenizers/punkt/english.pickle') if load else False
+        return Text.sentence_detector
 
     @staticmethod
     def unicode_to_ascii(sentence):
@@ -46,6 +121,9 @@ class Text:
         :param sentence:
         :return:
         """
+        if isinstance(sentence, str) and not Text.ESCAPE_RE.search(sentence):
+            # a plain ascii byte string is not changed by the conversion
+            return sentence
         return sentence.decode('unicode_escape').encode('ascii', 'ignore')
 
     def tokenize(self, sentence):
@@ -54,11 +132,21 @@ class Text:
         :param sentence: the sentence
         :return: the list of words
         """
+        metrics = Metrics.active
+        start = metrics and timeit.default_timer()
         sentence = self.unicode_to_ascii(sentence)
 
-        if has_nltk_tokenizer:
-            return map(str, self.tokenizer.tokenize(sentence))
-        return sentence.split()
+        words = None
+        if self.get_tokenizer_type() == Text.NLTK_TOKENIZER:
+            tokenizer = self.get_tokenizer()
+            if tokenizer:
+                words = map(str, tokenizer.tokenize(sentence))
+        if words is None:
+            words = Text.fast_tokenizer.tokenize(sentence)
+
+        if metrics:
+            metrics.add_time(Metrics.TOKENIZE, timeit.default_timer() - start)
+        return words
 
     @staticmethod
     def is_punctuation(word):
@@ -67,7 +155,7 @@ class Text:
         :param word: the word
         :return: is the word a punctuation (True / False)
         """
-        return not re.search('[a-zA-Z0-9]', word)
+        return not Text.ALPHANUMERIC_RE.search(word)
 
     def split_document(self, document):
         """
@@ -76,8 +164,9 @@ class Text:
         :return: a list of sentences
         """
         document = self.unicode_to_ascii(document)
-        if has_nltk_data:
-            return self.sentence_detector.tokenize(document)
+        sentence_detector = self.get_sentence_detector()
+        if sentence_detector:
+            return sentence_detector.tokenize(document)
         return re.split(r' *[\.\?!][\'"\)\]]* *', document)
 
     @staticmethod
@@ -125,6 +214,57 @@ class Text:
         :param words: the list of words
         :return: the lemmatized word list
         """
-        if has_nltk_lemmatizer:
-            return [self.lemmatizer.lemmatize(word) for word in words]
+        lemmatizer = self.get_lemmatizer()
+        if lemmatizer:
+            return [lemmatizer.lemmatize(word) for word in words]
+        return words
+
+    def normalize(self, sentence, negate=True, remove_punctuations=True, remove_stop_words=False, lemmatize=True):
+        """
+        Tokenizes and normalizes a sentence in a single pass over the words. The output is exactly the same as
+        tokenize followed by negate_words, remove_punctuations, remove_stop_words and lemmatize (as enabled),
+        the lemmas are memoized
+        :param sentence: the sentence
+        :param negate: adds NOT_ to the negated words
+        :param remove_punctuations: removes the punctuations (the negated ones are kept, like in the chain)
+        :param remove_stop_words: removes the stop words
+        :param lemmatize: lemmatizes the words
+        :return: the list of normalized words
+        """
+        lemmatizer = self.get_lemmatizer() if lemmatize else False
+        lemmas = Text.lemmas
+        has_alphanumeric = Text.ALPHANUMERIC_RE.search
+        negative_words = Text.NEGATIVE_WORD_SET
+        stop_words = Text.STOP_WORD_SET
+
+        words = []
+        negation_started = False
+        for word in self.tokenize(sentence):
+            is_punctuation = not has_alphanumeric(word)
+            if negation_started:
+                normalized_word = 'NOT_' + word
+            elif remove_punctuations and is_punctuation:
+                normalized_word = None
+            else:
+                normalized_word = word
+
+            if negate:
+                if word in negative_words:
+                    negation_started = not negation_started
+                if is_punctuation:
+                    negation_started = False
+
+            if normalized_word is None or (remove_stop_words and normalized_word.lower() in stop_words):
+                continue
+
+            if lemmatizer:
+                lemma = lemmas.get(normalized_word)
+                if lemma is None:
+                    lemma = lemmatizer.lemmatize(normalized_word)
+                    if len(lemmas) >= Text.LEMMA_CACHE_SIZE:
+                        lemmas.clear()
+                    lemmas[normalized_word] = lemma
+                normalized_word = lemma
+
+            words.append(normalized_word)
         return words
@@ -0,0 +1,125 @@
+import re
+
+try:
+    from htmlentitydefs import name2codepoint
+except ImportError:
+    from html.entities import name2codepoint
+
+__author__ = 'bijoy'
+
+
+class FastTweetTokenizer:
+    """
+    A tokenizer giving the same tokens as the nltk TweetTokenizer (with the default options) for ascii text,
+    without needing nltk. The token pattern is the one of nltk.tokenize.casual compiled for byte strings,
+    with a shortcut for the plain words.
+
+    A plain word is a run of letters not followed by a word character or by any of . : ; = @ + * ' -
+    No other token type can match there (urls, domains and e-mails need one of . : @ + -,
+    emoticons need the eyes : ; = 8 or the nose * ' and the other words would stop at the same letter),
+    so the shortcut gives the same token, it only saves trying all the other alternatives first.
+    """
+
+    EMOTICONS = r"""
+        (?:
+          [<>]?
+          [:;=8]                     # eyes
+          [\-o\*\']?                 # optional nose
+          [\)\]\(\[dDpP/\:\}\{@\|\\] # mouth
+          |
+          [\)\]\(\[dDpP/\:\}\{@\|\\] # mouth
+          [\-o\*\']?                 # optional nose
+          [:;=8]                     # eyes
+          [<>]?
+          |
+          <3                         # heart
+        )"""
+
+    TOKEN_RE = re.compile(r"""
+        [a-z]+(?![\w.:;=@+*'\-])              # plain words (see below)
+        |
+        (?:                                   # urls
+          https?:(?:/{1,3}|[a-z0-9%])
+          |
+          [a-z0-9.\-]+[.](?:[a-z]{2,13})/
+        )
+        (?:[^\s()<>{}\[\]]+|\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\))+
+        (?:\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\)|[^\s`!()\[\]{};:'".,<>?])
+        |
+        (?<!@)[a-z0-9]+(?:[.\-][a-z0-9]+)*[.](?:[a-z]{2,13})\b/?(?!@)  # naked domains
+        |
+        (?:(?:\+?[01][ *\-.\)]*)?(?:[\(]?\d{3}[ *\-.\)]*)?\d{3}[ *\-.\)]*\d{4})  # phone numbers
+        |
+        """ + EMOTICONS + r"""
+        |
+        <[^>\s]+>                             # html tags
+        |
+        [\-]+>|<[\-]+                         # arrows
+        |
+        (?:@[\w_]+)                           # user names
+        |
+        (?:\#+[\w_]+[\w\'_\-]*[\w_]+)         # hashtags
+        |
+        [\w.+-]+@[\w-]+\.(?:[\w-]\.?)+[\w-]   # e-mails
+        |
+        (?:[^\W\d_](?:[^\W\d_]|['\-_])+[^\W\d_])  # words with apostrophes or dashes
+        |
+        (?:[+\-]?\d+[,/.:-]\d+[+\-]?)         # numbers, including fractions and decimals
+        |
+        (?:[\w_]+)                            # words without apostrophes or dashes
+        |
+        (?:\.(?:\s*\.){1,})                   # ellipsis
+        |
+        (?:\S)                                # everything else that is not a space
+        """, re.VERBOSE | re.I)
+
+    HANG_RE = re.compile(r'([^a-zA-Z0-9])\1{3,}')
+    ENTITY_RE = re.compile(r'&(#?(x?))([^&;\s]+);')
+
+    @staticmethod
+    def replace_entity(match):
+        """
+        Replaces an html entity by its character, the entities which are not ascii characters are removed
+        :param match: the match of the entity
+        :return: the replacement
+        """
+        entity = match.group(3)
+        code_point = None
+        if match.group(1):
+            try:
+                code_point = int(entity, 16 if match.group(2) else 10)
+            except ValueError:
+                pass
+        else:
+            code_point = name2codepoint.get(entity)
+
+        if code_point is not None and code_point < 128:
+            return chr(code_point)
+        return ""
+
+    def prepare(self, text):
+        """
+        Replaces the html entities and shortens the runs of a repeated character, before matching the tokens
+        :param text: the text
+        :return: the prepared text
+        """
+        if '&' in text:
+            text = self.ENTITY_RE.sub(self.replace_entity, text)
+        return self.HANG_RE.sub(r'\1\1\1', text)
+
+    def tokenize(self, text):
+        """
+        Tokenizes an ascii text
+        :param text: the text
+        :return: the list of tokens
+        """
+        return self.TOKEN_RE.findall(self.prepare(text))
+
+    def scan(self, text):
+        """
+        Same as tokenize, one token at a time without building the list of tokens
+        :param text: the text
+        :return: a generator of the tokens
+        """
+        for match in self.TOKEN_RE.finditer(self.prepare(text)):
+            yield match.group()
@@ -0,0 +1,123 @@
+import logging
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+__author__ = 'bijoy'
+
+
+class UpdateLog:
+    """
+    The append-only log of the updates of a model, next to the model file.
+    Each update is a pickled tuple (update id, list of tagged lines), the ids are increasing.
+    """
+    EXTENSION = '.updates'
+
+    # the size of the log up to the end of its last complete update, by path (see get_valid_size)
+    sizes = dict()
+
+    @staticmethod
+    def append(path, update_id, tagged_lines):
+        """
+        Appends an update to the log, after removing a partly written last update (if a process was killed),
+        so that the updates appended after it can be read
+        :param path: the path of the model
+        :param update_id: the id of the update
+        :param tagged_lines: the list of (line, class) tuples
+        :return: the size of the log in bytes
+        """
+        log_path = path + UpdateLog.EXTENSION
+        valid_size = UpdateLog.get_valid_size(path)
+        with open(log_path, 'r+b' if os.path.exists(log_path) else 'wb') as log_file:
+            log_file.truncate(valid_size)
+            log_file.seek(valid_size)
+            pickle.dump((update_id, tagged_lines), log_file, 2)
+            size = UpdateLog.sizes[path] = log_file.tell()
+        return size
+
+    @staticmethod
+    def read(path):
+        """
+        Reads the updates of the log, a partly written last update (if the process was killed) is skipped
+        :param path: the path of the model
+        :return: a generator of (update id, tagged lines) tuples
+        """
+        for update_id, tagged_lines, end in UpdateLog.read_entries(path):
+            yield update_id, tagged_lines
+
+    @staticmethod
+    def read_entries(path):
+        """
+        Reads the updates of the log with their end in the file, a partly written last update is skipped
+        :param path: the path of the model
+        :return: a generator of (update id, tagged lines, offset of the end of the update) tuples
+        """
+        try:
+            log_file = open(path + UpdateLog.EXTENSION, 'rb')
+        except IOError:
+            return
+
+        with log_file:
+            while True:
+                try:
+                    update_id, tagged_lines = pickle.load(log_file)
+                except EOFError:
+                    return
+                except Exception:
+                    logging.warning("skipping the incomplete end of the update log " + path + UpdateLog.EXTENSION)
+                    return
+                yield update_id, tagged_lines, log_file.tell()
+
+    @staticmethod
+    def get_valid_size(path):
+        """
+        Returns the size of the log up to the end of its last complete update, the log is only read again
+        if its size is not the one left by the last append of this process
+        :param path: the path of the model
+        :return: the size in bytes, 0 if there is no log
+        """
+        log_path = path + UpdateLog.EXTENSION
+        if not os.path.exists(log_path):
+            return 0
+        size = UpdateLog.sizes.get(path)
+        if size is not None and size == os.path.getsize(log_path):
+            return size
+
+        size = 0
+        for update_id, tagged_lines, end in UpdateLog.read_entries(path):
+            size = end
+        UpdateLog.sizes[path] = size
+        return size
+
+    @staticmethod
+    def get_last_id(path):
+        """
+        :param path: the path of the model
+        :return: the id of the last update in the log, 0 if there is none
+        """
+        last_id = 0
+        for update_id, tagged_lines in UpdateLog.read(path):
+            last_id = max(last_id, update_id)
+        return last_id
+
+    @staticmethod
+    def exists(path):
+        """
+        :param path: the path of the model
+        :return: does the model have an update log (True / False)
+        """
+        return os.path.exists(path + UpdateLog.EXTENSION)
+
+    @staticmethod
+    def remove(path):
+        """
+        Removes the log (once its updates are saved in the model file)
+        :param path: the path of the model
+        :return: None
+        """
+        UpdateLog.sizes.pop(path, None)
+        if os.path.exists(path + UpdateLog.EXTENSION):
+            os.remove(path + UpdateLog.EXTENSION)